@@ -0,0 +1,114 @@
+"""Benchmark the slack export pipeline stage by stage on a synthetic or real export ZIP.
+
+Times validate_input, create_convo_objects, and print_pdf separately, then reruns the pipeline
+with tracemalloc to record peak memory of each stage without skewing the timings. Results are
+appended as one JSON line per run so regressions can be tracked across releases.
+Dates are built lazily, so parsing time is counted in print_pdf.
+
+Run from the slackcli directory:
+    python -m benchmarks.export_pipeline --days 30 --output benchmarks/results.jsonl
+    python -m benchmarks.export_pipeline --zip ~/Desktop/export.zip --user bob@company.co
+"""
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from zipfile import ZipFile
+
+import click
+
+from benchmarks.synthetic import write_export
+from slackcli.export import Pdf
+
+
+def run_stage(results, name, func, *args):
+    """Run pipeline stage, recording wall & CPU time, or traced peak memory if tracing."""
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        func(*args)
+        results[name] = {'peak_mb': round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)}
+        return
+    wall, cpu = time.perf_counter(), time.process_time()
+    func(*args)
+    results[name] = {'wall': round(time.perf_counter() - wall, 4),
+                     'cpu': round(time.process_time() - cpu, 4)}
+
+
+def run_pipeline(zip_path, user, dates, channel, output_dir):
+    """Run the export pipeline the way slack export does. Return dict of stage results."""
+    results = {}
+    pdf = Pdf(user, dates, channel)
+    with ZipFile(zip_path) as unzipped:
+        pdf.zip_file = unzipped
+        run_stage(results, 'validate_input', pdf.validate_input)
+        if pdf.input_email and not pdf.input_channel:
+            convo_types = ['dms', 'mpims', 'groups', 'channels']
+        else:
+            convo_types = ['groups', 'channels']
+        run_stage(results, 'create_convo_objects', pdf.create_convo_objects, convo_types)
+        cwd = os.getcwd()
+        os.chdir(output_dir)
+        try:
+            run_stage(results, 'print_pdf', pdf.print_pdf, convo_types)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+@click.command()
+@click.option('--zip', 'zip_path', type=click.Path(exists=True, dir_okay=False),
+              help='Existing export ZIP to benchmark. A synthetic export is generated if not given.')
+@click.option('-u', '--user', help='Email address of user to extract messages from.')
+@click.option('-d', '--dates', nargs=2, type=click.DateTime(formats=['%m/%d/%Y']),
+              help='Date range to extract messages from. [FORMAT MM/DD/YYYY MM/DD/YYYY]')
+@click.option('-c', '--channel', help='Channel name of specific private/public channel to extract.')
+@click.option('--users', default=200, show_default=True, help='Synthetic export: number of users.')
+@click.option('--channels', default=20, show_default=True, help='Synthetic export: number of public channels.')
+@click.option('--days', default=30, show_default=True, help='Synthetic export: days of history.')
+@click.option('--messages', default=100, show_default=True, help='Synthetic export: messages per channel per day.')
+@click.option('--thread-ratio', default=0.2, show_default=True, help='Synthetic export: share of thread replies.')
+@click.option('--seed', default=1, show_default=True, help='Synthetic export: random seed.')
+@click.option('--memory/--no-memory', default=True, show_default=True,
+              help='Rerun the pipeline with tracing to record peak memory per stage.')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True),
+              help='Append results as a JSON line to this file.')
+def main(zip_path, user, dates, channel, users, channels, days, messages, thread_ratio, seed, memory, output):
+    """Time each stage of the export pipeline & report peak memory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = None
+        if not zip_path:
+            zip_path = os.path.join(tmp, 'synthetic.zip')
+            synthetic = {'users': users, 'channels': channels, 'days': days, 'messages': messages,
+                         'thread_ratio': thread_ratio, 'seed': seed}
+            synthetic['counts'] = write_export(zip_path, users=users, channels=channels, days=days,
+                                               messages=messages, thread_ratio=thread_ratio, seed=seed)
+        stages = run_pipeline(zip_path, user, dates, channel, tmp)
+        if memory:
+            tracemalloc.start()
+            for name, result in run_pipeline(zip_path, user, dates, channel, tmp).items():
+                stages[name].update(result)
+            tracemalloc.stop()
+
+    report = {'timestamp': datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(),
+              'zip': None if synthetic else os.path.abspath(zip_path),
+              'synthetic': synthetic,
+              'options': {'user': user, 'channel': channel,
+                          'dates': [date.strftime('%Y-%m-%d') for date in dates] if dates else None},
+              'stages': stages,
+              'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)}
+    for name, result in stages.items():
+        peak = f', peak {result["peak_mb"]}MB' if 'peak_mb' in result else ''
+        click.echo(f'{name}: wall {result["wall"]}s, cpu {result["cpu"]}s{peak}')
+    click.echo(f'max RSS: {report["max_rss_mb"]}MB')
+    if output:
+        with open(output, 'a') as results_file:
+            results_file.write(json.dumps(report) + '\n')
+
+
+if __name__ == '__main__':
+    main()
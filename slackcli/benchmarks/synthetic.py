@@ -0,0 +1,195 @@
+"""Generate a synthetic Slack workspace export ZIP for benchmarking the export pipeline.
+
+Run from the slackcli directory:
+    python -m benchmarks.synthetic ~/Desktop/synthetic.zip --users 500 --channels 50 --days 90
+"""
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import click
+
+
+WORDS = ('the deploy is done please review the doc for tomorrow standup meeting notes '
+         'can someone take a look at this ticket thanks ok sounds good ship it').split()
+
+
+def synthetic_users(count, bots=0):
+    """Create users file data for count users & bots."""
+    users = [{'id': f'U{index:08d}',
+              'team_id': 'T00000001',
+              'name': f'user{index}',
+              'deleted': False,
+              'real_name': f'User {index}',
+              'is_admin': index == 0,
+              'is_owner': index == 0,
+              'is_bot': False,
+              'profile': {'real_name': f'User {index}',
+                          'display_name': f'user{index}',
+                          'email': f'user{index}@example.com',
+                          'image_72': f'https://example.com/avatars/{index}.png'}}
+             for index in range(count)]
+    users += [{'id': f'U9{index:07d}',
+               'team_id': 'T00000001',
+               'name': f'bot{index}',
+               'deleted': False,
+               'real_name': f'Bot {index}',
+               'is_bot': True,
+               'profile': {'real_name': f'Bot {index}', 'bot_id': f'B{index:08d}'}}
+              for index in range(bots)]
+    return users
+
+
+def synthetic_text(rand, members, mention_ratio):
+    """Create message text, mentioning a member with probability mention_ratio."""
+    words = rand.choices(WORDS, k=rand.randint(3, 30))
+    if rand.random() < mention_ratio:
+        words.insert(rand.randrange(len(words)), f'<@{rand.choice(members)}>')
+    if rand.random() < mention_ratio / 2:
+        words.append('<https://example.com/page|page>')
+    return ' '.join(words)
+
+
+def synthetic_message(rand, user, ts, members, mention_ratio):
+    """Create raw message data sent by user at ts."""
+    msg = {'client_msg_id': f'{rand.getrandbits(64):016x}',
+           'type': 'message',
+           'text': synthetic_text(rand, members, mention_ratio),
+           'user': user['id'],
+           'ts': f'{ts:.6f}',
+           'team': 'T00000001',
+           'user_team': 'T00000001',
+           'user_profile': {'avatar_hash': f'{rand.getrandbits(32):08x}',
+                            'image_72': user['profile'].get('image_72'),
+                            'first_name': user['real_name'].split()[0],
+                            'real_name': user['real_name'],
+                            'display_name': user['name'],
+                            'team': 'T00000001',
+                            'name': user['name'],
+                            'is_restricted': False,
+                            'is_ultra_restricted': False}}
+    if user['is_bot']:
+        msg.pop('user_profile')
+        msg['subtype'] = 'bot_message'
+        msg['bot_id'] = user['profile']['bot_id']
+        msg['username'] = user['name']
+    return msg
+
+
+def synthetic_day(messages, users, thread_ratio, seed, members=None, date=None, edit_ratio=0.0,
+                  file_ratio=0.0, reaction_ratio=0.0, mention_ratio=0.0):
+    """Create a channel day of messages where thread_ratio of messages are thread replies."""
+    rand = random.Random(seed)
+    date = date or datetime(2020, 1, 1, tzinfo=timezone.utc)
+    members = members or [user['id'] for user in users]
+    by_id = {user['id']: user for user in users}
+    senders = [by_id[member] for member in members if member in by_id]
+    ts = date.timestamp() + 8 * 3600
+    msgs = []
+    parents = []
+    for _ in range(messages):
+        ts += rand.random() * 36000 / messages
+        user = rand.choice(senders)
+        msg = synthetic_message(rand, user, ts, members, mention_ratio)
+        sender = msg.get('user', msg.get('bot_id'))
+        if parents and rand.random() < thread_ratio:
+            parent = rand.choice(parents)
+            parent['thread_ts'] = parent['ts']
+            parent['reply_count'] = parent.get('reply_count', 0) + 1
+            reply_users = parent.setdefault('reply_users', [])
+            if sender not in reply_users:
+                reply_users.append(sender)
+            msg['thread_ts'] = parent['ts']
+            msg['parent_user_id'] = parent.get('user', parent.get('bot_id'))
+        else:
+            parents.append(msg)
+        if rand.random() < edit_ratio:
+            msg['edited'] = {'user': sender, 'ts': f'{ts + 60:.6f}'}
+        if rand.random() < file_ratio:
+            msg['files'] = [{'id': f'F{rand.getrandbits(32):08X}',
+                             'name': f'file{rand.randint(0, 999)}.pdf',
+                             'title': 'Attached file',
+                             'user': sender}]
+        if rand.random() < reaction_ratio:
+            msg['reactions'] = [{'name': 'thumbsup',
+                                 'users': rand.sample(members, min(len(members), rand.randint(1, 3))),
+                                 'count': 1}]
+        msgs.append(msg)
+    return msgs
+
+
+def write_export(path, users=200, bots=5, channels=20, groups=5, dms=20, mpims=5, days=30, messages=100,
+                 members=25, thread_ratio=0.2, edit_ratio=0.05, file_ratio=0.05, reaction_ratio=0.1,
+                 mention_ratio=0.1, start=datetime(2020, 1, 1, tzinfo=timezone.utc), seed=1):
+    """Write a synthetic Slack export ZIP to path.
+    Every conversation gets a file for each of days, with messages per day varying by +/- 50%.
+    Return dict of counts written.
+    """
+    rand = random.Random(seed)
+    users_json = synthetic_users(users, bots)
+    ids = [user['id'] for user in users_json]
+    convos = {
+        'channels': [{'id': f'C{index:08d}', 'name': f'channel-{index}', 'created': int(start.timestamp()),
+                      'members': rand.sample(ids, min(members, len(ids)))}
+                     for index in range(channels)],
+        'groups': [{'id': f'G{index:08d}', 'name': f'private-{index}', 'created': int(start.timestamp()),
+                    'members': rand.sample(ids, min(members, len(ids)))}
+                   for index in range(groups)],
+        'dms': [{'id': f'D{index:08d}', 'created': int(start.timestamp()),
+                 'members': rand.sample(ids[:users] or ids, 2)}
+                for index in range(dms)],
+        'mpims': [{'id': f'G9{index:07d}', 'name': f'mpdm-group-{index}', 'created': int(start.timestamp()),
+                   'members': rand.sample(ids[:users] or ids, min(4, len(ids[:users] or ids)))}
+                  for index in range(mpims)]
+    }
+    count = 0
+    with ZipFile(path, 'w', ZIP_DEFLATED) as zip_file:
+        zip_file.writestr('users.json', json.dumps(users_json, indent=4))
+        for convo_type, data in convos.items():
+            zip_file.writestr(f'{convo_type}.json', json.dumps(data, indent=4))
+        for convo_type, data in convos.items():
+            for convo in data:
+                folder = convo['id'] if convo_type == 'dms' else convo['name']
+                for day in range(days):
+                    date = start + timedelta(days=day)
+                    day_messages = max(1, int(messages * rand.uniform(0.5, 1.5)))
+                    msgs = synthetic_day(day_messages, users_json, thread_ratio, rand.random(),
+                                         members=convo['members'], date=date, edit_ratio=edit_ratio,
+                                         file_ratio=file_ratio, reaction_ratio=reaction_ratio,
+                                         mention_ratio=mention_ratio)
+                    zip_file.writestr(f'{folder}/{date.strftime("%Y-%m-%d")}.json', json.dumps(msgs, indent=4))
+                    count += len(msgs)
+    return {'users': len(users_json),
+            'conversations': sum(len(data) for data in convos.values()),
+            'messages': count}
+
+
+@click.command()
+@click.argument('path', required=True, type=click.Path(dir_okay=False, writable=True))
+@click.option('--users', default=200, show_default=True, help='Number of human users.')
+@click.option('--bots', default=5, show_default=True, help='Number of bot users.')
+@click.option('--channels', default=20, show_default=True, help='Number of public channels.')
+@click.option('--groups', default=5, show_default=True, help='Number of private channels.')
+@click.option('--dms', default=20, show_default=True, help='Number of direct message conversations.')
+@click.option('--mpims', default=5, show_default=True, help='Number of multi-party direct message conversations.')
+@click.option('--days', default=30, show_default=True, help='Number of days of history per conversation.')
+@click.option('--messages', default=100, show_default=True, help='Average messages per conversation per day.')
+@click.option('--members', default=25, show_default=True, help='Members per channel.')
+@click.option('--thread-ratio', default=0.2, show_default=True, help='Share of messages that are thread replies.')
+@click.option('--edit-ratio', default=0.05, show_default=True, help='Share of messages that are edited.')
+@click.option('--file-ratio', default=0.05, show_default=True, help='Share of messages with a file.')
+@click.option('--reaction-ratio', default=0.1, show_default=True, help='Share of messages with reactions.')
+@click.option('--mention-ratio', default=0.1, show_default=True, help='Share of messages mentioning a user.')
+@click.option('--start', default='01/01/2020', show_default=True,
+              type=click.DateTime(formats=['%m/%d/%Y']), help='First day of history. [FORMAT MM/DD/YYYY]')
+@click.option('--seed', default=1, show_default=True, help='Random seed.')
+def main(path, start, **options):
+    """Write a synthetic Slack export ZIP to PATH."""
+    counts = write_export(path, start=start.replace(tzinfo=timezone.utc), **options)
+    click.echo(f'Wrote {path}: {counts["users"]} users, {counts["conversations"]} conversations, '
+               f'{counts["messages"]} messages.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark thread reconstruction in Conversation.sort_messages on a synthetic channel day.
+
+Run from the slackcli directory:
+    python -m benchmarks.thread_sort --messages 50000
+"""
+import random
+import time
+from types import SimpleNamespace
+
+import click
+
+from benchmarks.synthetic import synthetic_users, synthetic_day
+from slackcli.clock import Clock
+from slackcli.conversations import Conversation
+from slackcli.user import UserDirectory
+
+
+@click.command()
+@click.option('--messages', default=50000, help='Number of messages in the synthetic day.')
+@click.option('--users', default=20, help='Number of users in the workspace & channel.')
+@click.option('--thread-ratio', default=0.3, help='Share of messages that are thread replies.')
+@click.option('--repeat', default=5, help='Number of timed sort_messages runs.')
+@click.option('--seed', default=1, help='Random seed.')
+def main(messages, users, thread_ratio, repeat, seed):
+    """Time Conversation.sort_messages on a synthetic channel day."""
+    users_json = synthetic_users(users)
+    day = synthetic_day(messages, users_json, thread_ratio, seed)
+    random.Random(seed).shuffle(day)
+    export = SimpleNamespace(user_directory=UserDirectory(users_json), clock=Clock(), input_email=None,
+                             target_user=None)
+    channels = [{'name': 'general', 'members': [user['id'] for user in users_json]}]
+    date = SimpleNamespace(export=export, convo_type=channels)
+
+    start = time.perf_counter()
+    convo = Conversation(day, date, ('general/2020-01-01.json', '2020-01-01'))
+    convo.sort_messages()
+    build = time.perf_counter() - start
+
+    timings = []
+    for _ in range(repeat):
+        convo.messages = [msg for msg in convo.messages]
+        random.Random(seed).shuffle(convo.messages)
+        start = time.perf_counter()
+        convo.sort_messages()
+        timings.append(time.perf_counter() - start)
+
+    click.echo(f'messages: {messages}, threaded: {sum(1 for msg in day if msg.get("parent_user_id"))}')
+    click.echo(f'conversation build (incl. first sort): {build:.3f}s')
+    click.echo(f'sort_messages: best {min(timings):.3f}s, mean {sum(timings) / len(timings):.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ setup(
     name="slack",
     version='1.0',
     packages=find_packages(),
+    python_requires='>=3.9',
     install_requires=[
         'aiohttp==3.6.2',
         'async-timeout==3.0.1',
@@ -15,11 +16,12 @@ setup(
         'colorama==0.4.3',
         'idna==2.8',
         'multidict==4.7.4',
-        'Pillow==7.0.0',
+        'Pillow==9.5.0',
         'pyfiglet==0.8.post1',
-        'reportlab==3.5.34',
+        'reportlab==3.6.12',
         'slackclient==2.5.0',
         'typing-extensions==3.7.4.1',
+        'tzdata==2023.3',
         'urllib3==1.25.8',
         'yarl==1.4.2'
         ],
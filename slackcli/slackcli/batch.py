@@ -0,0 +1,157 @@
+import os
+import queue
+import threading
+
+import click
+
+from slackcli.export import ARCHIVE_PROPERTIES
+from slackcli.dates import Date
+from slackcli.profiling import PROFILE
+
+
+DONE = object()
+
+
+class Custodian:
+    """Class representing the output of one convo-type for one user in a batch export.
+    The renderer runs in its own thread & pulls each Date only when it needs more, so the batch
+    and the renderer take turns & never run at the same time.
+    """
+    def __init__(self, export, convo_type, files, convo_json):
+        self.export = export
+        self.convo_type = convo_type
+        self.files = set(files)
+        self.convo_json = convo_json
+        self.inbox = queue.Queue(maxsize=1)
+        self.ready = queue.Queue(maxsize=1)
+        self.name = f'{export.input_email}/{convo_type}'
+        self.alive = False
+        self.error = None
+
+    def start(self):
+        """Start renderer thread & wait until it asks for its first Date."""
+        threading.Thread(target=self.run, args=(self.name,), daemon=True).start()
+        self.alive = self.ready.get()
+
+    def run(self, name):
+        """Render output file from the Dates sent by the batch."""
+        try:
+            with PROFILE.stage('render'):
+                self.export.render_file(name, self.convo_type, self.days())
+        except BaseException as error:
+            self.error = error
+        finally:
+            self.ready.put(False)
+
+    def days(self):
+        """Generate Dates of the user's conversations sent by the batch, asking for each one in turn."""
+        while True:
+            self.ready.put(True)
+            with PROFILE.stage('render_wait'):
+                item = self.inbox.get()
+            if item is DONE:
+                return
+            date, files, convos = item
+            yield Date(self.export, files, date, self.convo_json, convos)
+
+    def send(self, item):
+        """Hand item to renderer & wait until it asks for the next one or finishes."""
+        if self.alive:
+            self.inbox.put(item)
+            self.alive = self.ready.get()
+
+    def finish(self):
+        """Signal end of Dates & wait for output file to be written."""
+        self.send(DONE)
+        if self.error:
+            raise self.error
+
+
+class Batch:
+    """Batch Class. Exports many users from a single pass over the ZIP file.
+    Archive level properties are loaded once & shared by every user's Export. Each member file is
+    decoded & parsed once & its Conversation is sent to the output of every user active in it.
+    """
+    def __init__(self, renderer, emails, dates=None, channel=None, tz=None):
+        self.archive = renderer(None, dates, channel, tz)
+        unique = {}
+        for email in emails:
+            unique.setdefault(email.lower(), email)
+        self.exports = [renderer(email, dates, channel, tz) for email in unique.values()]
+        self.custodians = {}
+        self.jobs = 1
+        self.progress = None
+
+    @property
+    def archive_key(self):
+        """Property: key of zip_file from its size & modification time."""
+        return self.archive.archive_key
+
+    @property
+    def zip_file(self):
+        """Getter Property: zip_file."""
+        return self.archive.zip_file
+
+    @zip_file.setter
+    def zip_file(self, file):
+        """Setter Property: zip_file."""
+        self.archive.zip_file = file
+
+    def validate_input(self):
+        """Validate channel & dates once, then each user against the shared archive properties."""
+        self.archive.validate_input()
+        for name in ARCHIVE_PROPERTIES:
+            getattr(self.archive, name)
+        for export in self.exports:
+            export.share_archive(self.archive)
+            export.validate_input()
+
+    @staticmethod
+    def user_files(export, convo_type):
+        """Return relevant files of a convo-type for a user. No files if user was not active in it."""
+        try:
+            return getattr(export, f'{convo_type}_files')
+        except click.BadParameter:
+            return []
+
+    def create_convo_objects(self, files_list, jobs=1):
+        """Create a Custodian for each user active in each convo-type, holding the user's relevant files.
+        With more than 1 job, Dates are parsed by a pool of worker processes.
+        """
+        self.jobs = jobs
+        for convo_type in files_list:
+            convo_json = getattr(self.archive, f'{convo_type}_json')
+            for export in self.exports:
+                user_files = self.user_files(export, convo_type)
+                if user_files:
+                    custodian = Custodian(export, convo_type, user_files, convo_json)
+                    self.custodians.setdefault(convo_type, []).append(custodian)
+
+    def render(self, convo_types):
+        """Render output of each convo-type for every user, in a folder named after the user's email.
+        Each date's files are parsed once & their Conversations sent to every user active in them.
+        Outputs finished by an earlier run are skipped.
+        """
+        for export in self.exports:
+            os.makedirs(export.input_email, exist_ok=True)
+            export.progress = self.progress
+        for convo_type in convo_types:
+            custodians = [custodian for custodian in self.custodians.get(convo_type, [])
+                          if not custodian.export.unit_done(custodian.name)]
+            files = set().union(*(custodian.files for custodian in custodians))
+            for custodian in custodians:
+                custodian.start()
+            for day in self.archive.pipeline(convo_type, files, self.jobs):
+                convos = {convo.convo_id: convo for convo in day.convos}
+                for custodian in custodians:
+                    user_date_files = [file for file in day.files if file in custodian.files]
+                    if user_date_files:
+                        user_convos = [convos[file[0].split('/')[0]] for file in user_date_files]
+                        custodian.send((day.date, user_date_files, user_convos))
+            for custodian in custodians:
+                custodian.finish()
+                custodian.export.unit_complete(custodian.name, convo_type, custodian.files)
+
+    def make_dir(self):
+        """Create directory on desktop of user for output files."""
+        self.archive.make_dir()
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, name TEXT, email TEXT, data TEXT, fetched REAL);
+CREATE TABLE IF NOT EXISTS channels (id TEXT PRIMARY KEY, name TEXT, data TEXT, fetched REAL);
+CREATE INDEX IF NOT EXISTS users_email ON users (email);
+CREATE INDEX IF NOT EXISTS users_name ON users (name);
+CREATE INDEX IF NOT EXISTS channels_name ON channels (name);
+'''
+
+
+def slim_api_user(user):
+    """Return copy of Slack API user with only the fields SlackAPI reads."""
+    slim = {key: user.get(key) for key in ('id', 'name', 'real_name', 'is_admin', 'is_owner')}
+    slim['profile'] = {key: user.get('profile', {}).get(key) for key in ('real_name', 'email')}
+    return slim
+
+
+def slim_api_channel(channel):
+    """Return copy of Slack API channel with only the fields SlackAPI reads."""
+    return {key: channel.get(key) for key in ('id', 'name', 'is_private')}
+
+
+class DirectoryCache:
+    """Class representing an SQLite cache of the workspace users & channels, saved in ~/.slackcli & keyed
+    on a hash of the API token. Each user & channel is saved as the API returns it & expires after ttl
+    seconds, so the cache is refreshed a listing or lookup at a time. Falls back to an in memory cache if
+    the file cannot be opened.
+    """
+    TTL = 24 * 60 * 60
+
+    def __init__(self, api_token, ttl=TTL):
+        self.ttl = ttl
+        digest = hashlib.sha256(api_token.encode()).hexdigest()
+        self.path = os.path.join(os.path.expanduser('~'), '.slackcli', f'directory.{digest[:16]}.sqlite')
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path)
+            self.connection.executescript(SCHEMA)
+        except (OSError, sqlite3.Error):
+            self.connection = sqlite3.connect(':memory:')
+            self.connection.executescript(SCHEMA)
+
+    @property
+    def oldest(self):
+        """Property: fetch time of the oldest entry still fresh."""
+        return time.time() - self.ttl
+
+    def user(self, key):
+        """Return cached user by email or ID. None if not cached or expired."""
+        if '@' in key:
+            query = 'SELECT data FROM users WHERE email = ? AND fetched >= ?'
+            key = key.lower()
+        else:
+            query = 'SELECT data FROM users WHERE id = ? AND fetched >= ?'
+        row = self.connection.execute(query, (key, self.oldest)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def users(self, ids):
+        """Return dict of user ID to cached user for each of ids cached & not expired."""
+        ids = list(ids)
+        users = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self.connection.execute(f'SELECT id, data FROM users WHERE id IN ({",".join("?" * len(chunk))}) '
+                                           f'AND fetched >= ?', (*chunk, self.oldest))
+            users.update((id, json.loads(data)) for id, data in rows)
+        return users
+
+    def channel(self, key):
+        """Return cached channel by ID or name. None if not cached or expired."""
+        row = self.connection.execute('SELECT data FROM channels WHERE (id = ? OR name = ?) AND fetched >= ? '
+                                      'ORDER BY id = ? DESC', (key, key, self.oldest, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_users(self, users):
+        """Save users returned by the API, replacing older copies."""
+        fetched = time.time()
+        self.connection.executemany('INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)',
+                                    ((user['id'], user.get('name'),
+                                      (user.get('profile', {}).get('email') or '').lower() or None,
+                                      json.dumps(slim_api_user(user)), fetched)
+                                     for user in users))
+        self.connection.commit()
+
+    def save_channels(self, channels):
+        """Save channels returned by the API, replacing older copies."""
+        fetched = time.time()
+        self.connection.executemany('INSERT OR REPLACE INTO channels VALUES (?, ?, ?, ?)',
+                                    ((channel['id'], channel.get('name'), json.dumps(slim_api_channel(channel)),
+                                      fetched)
+                                     for channel in channels))
+        self.connection.commit()
+
+    def saving(self, save, items):
+        """Generate each item, saving them with save once the stream ends or is closed."""
+        seen = []
+        try:
+            for item in items:
+                seen.append(item)
+                yield item
+        finally:
+            save(seen)
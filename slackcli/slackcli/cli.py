@@ -1,9 +1,20 @@
+import csv
+import json
+import os
+import sys
+import textwrap
+
 import click
 from pyfiglet import Figlet
 from zipfile import ZipFile
 
-from slackcli.export import Pdf
+from slackcli.renderers import RENDERERS
+from slackcli.batch import Batch
+from slackcli.progress import Progress
+from slackcli.profiling import PROFILE
 from slackcli.slack_api import SlackAPI
+from slackcli.index import archive_key
+from slackcli.store import ExportStore
 
 
 def display(obj):
@@ -13,16 +24,16 @@ def display(obj):
         'slack': font.renderText('Slack'),
         'cli': '\tcommand line interface'
     }
-    click.secho(f'{marquee["slack"]}', fg='bright_magenta', nl=False, bold=True)
-    click.secho(f'{marquee["cli"]}', fg='cyan')
-    click.secho('  ⱽᵉʳˢⁱᵒⁿ ¹⋅⁰ ᵇʸ ᴴᵃʳʳⁱˢᵒⁿ ᴹ⋅ ᶠᵒʳ ᴮⁱʳᵈ', fg='bright_black', dim=True)
-    click.secho('⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻')
+    click.secho(f'{marquee["slack"]}', fg='bright_magenta', nl=False, bold=True, err=True)
+    click.secho(f'{marquee["cli"]}', fg='cyan', err=True)
+    click.secho('  ⱽᵉʳˢⁱᵒⁿ ¹⋅⁰ ᵇʸ ᴴᵃʳʳⁱˢᵒⁿ ᴹ⋅ ᶠᵒʳ ᴮⁱʳᵈ', fg='bright_black', dim=True, err=True)
+    click.secho('⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻', err=True)
     return obj
 
 
-def clear_line(status):
+def clear_line(status, err=False):
     """Clear terminal line in place & return cursur to start of line."""
-    print(f'\r{len(status) * " "}', end='\r', flush=True)
+    print(f'\r{len(status) * " "}', end='\r', flush=True, file=sys.stderr if err else sys.stdout)
 
 
 @click.group()
@@ -31,6 +42,8 @@ def cli():
     """
     > slack export --help
 
+    > slack ingest --help
+
     > slack channel --help
 
     > slack user --help
@@ -40,59 +53,180 @@ def cli():
 
 
 @cli.command()
-@click.option('-u', '--user',
-              help='Email address of user to extract messages from.')
+@click.option('-u', '--user', 'users',
+              multiple=True,
+              help='Email address of user to extract messages from. Repeat to export several users.')
+@click.option('--users-file',
+              type=click.File(),
+              help='File of user email addresses, one per line, to export in a single pass.')
 @click.option('-d', '--dates',
               nargs=2,
               type=click.DateTime(formats=['%m/%d/%Y']),
               help='Date range to extract messages from (start date - end date). [FORMAT MM/DD/YYYY MM/DD/YYYY]')
 @click.option('-c', '--channel',
-              help='Channel name of specific private/public channel to extract.')
+              help='Channel name or ID of specific private/public channel to extract.')
+@click.option('--tz',
+              help='IANA time zone to show message times in, e.g. America/New_York. [DEFAULT local time zone]')
+@click.option('-s', '--split',
+              type=click.Choice(['month', 'channel', 'messages']),
+              help='Split PDFs into volumes by month, channel, or message count & render them in parallel.')
+@click.option('-f', '--format', 'output_format',
+              default='pdf', show_default=True, type=click.Choice(list(RENDERERS)),
+              help='Output format. PDF, JSON Lines, CSV, or static HTML.')
+@click.option('--volume-size',
+              default=50000, show_default=True,
+              help='Target number of messages per volume when splitting by messages.')
+@click.option('-j', '--jobs',
+              default=1, show_default=True, type=click.IntRange(min=1),
+              help='Number of worker processes used to parse conversations & render volumes.')
+@click.option('--resume',
+              is_flag=True,
+              help='Resume an interrupted export, skipping output files it finished.')
+@click.option('--profile',
+              is_flag=True,
+              help='Write time spent in each export stage & counters to profile.json in the output folder.')
+@click.option('--cprofile',
+              is_flag=True,
+              help='Write a cProfile dump of the export to profile.prof in the output folder.')
 @click.argument('file', required=True, type=click.Path(exists=True))
 @click.pass_context
-def export(ctx, file, user, dates, channel):
+def export(ctx, file, users, users_file, dates, channel, tz, split, output_format, volume_size, jobs, resume,
+           profile, cprofile):
     """[ARG] File Path [OPTIONS]"""
-    if user:
+    users = [*users, *(line.strip() for line in users_file or () if line.strip())]
+    for user in users:
         if '@' and '.' not in user:
             raise click.BadParameter('Input must be in the format of an email address.')
+    batch = len(users) > 1 or users_file is not None
+    if batch and split:
+        raise click.BadParameter('Split option is not supported when exporting multiple users.')
     if dates:
         if dates[0] > dates[1]:
             raise click.BadParameter('Start date must be before or equal to End date.')
 
-    ctx.obj = Pdf(user, dates, channel)
+    if profile or cprofile:
+        PROFILE.start(cprofile)
+
+    if batch:
+        ctx.obj = Batch(RENDERERS[output_format], users, dates, channel, tz)
+    else:
+        ctx.obj = RENDERERS[output_format](users[0] if users else None, dates, channel, tz)
     with ZipFile(file) as unzipped:
         ctx.obj.zip_file = unzipped
         status = 'Validating file & input..'
         click.secho(status, blink=True, nl=False)
         ctx.obj.validate_input()
-        if ctx.obj.input_email and not ctx.obj.input_channel:
+        if users and not channel:
             convo_types = ['dms', 'mpims', 'groups', 'channels']
         else:
             convo_types = ['groups', 'channels']
 
         clear_line(status)
-        status = 'Converting Slack export to PDF...'
+        status = f'Converting Slack export to {output_format.upper()}...'
         click.secho(status, blink=True, nl=False)
-        ctx.obj.create_convo_objects(convo_types)
+        ctx.obj.create_convo_objects(convo_types, jobs)
         ctx.obj.make_dir()
-        ctx.obj.print_pdf(convo_types)
+        ctx.obj.progress = Progress({'zip': ctx.obj.archive_key,
+                                     'format': output_format,
+                                     'users': sorted({user.lower() for user in users}),
+                                     'dates': [date.strftime('%Y-%m-%d') for date in dates or ()],
+                                     'channel': channel,
+                                     'tz': tz,
+                                     'split': split,
+                                     'volume_size': volume_size if split == 'messages' else None}, resume)
+        if split:
+            ctx.obj.render_volumes(convo_types, split, volume_size, jobs)
+        else:
+            ctx.obj.render(convo_types)
+        PROFILE.stop('profile.json' if profile else None, 'profile.prof' if cprofile else None)
         clear_line(status)
-        click.secho('PDF export Complete!')
+        click.secho(f'{output_format.upper()} export Complete!')
 
 
 @cli.command()
-@click.argument('channel', required=True)
+@click.argument('file', required=True, type=click.Path(exists=True))
+def ingest(file):
+    """[ARG] File Path"""
+    path = os.path.abspath(file)
+    store = ExportStore(path, archive_key(path))
+    status = 'Ingesting Slack export...'
+    click.secho(status, blink=True, nl=False)
+    with ZipFile(path) as unzipped:
+        store.ingest(unzipped)
+    clear_line(status)
+    click.secho(f'Ingest Complete! Exports of this file will now read from {store.path}')
+
+
+@cli.command()
+@click.option('--channels-file',
+              type=click.File(),
+              help='File of channel names or IDs, one per line, to look up in a single pass.')
+@click.option('-f', '--format', 'output_format',
+              default='table', show_default=True, type=click.Choice(['table', 'csv', 'json']),
+              help='Output format. Channel details as a table, one CSV row per member, or JSON.')
+@click.option('--refresh',
+              is_flag=True,
+              help='Skip cached users & channels, refreshing them from the Slack API.')
+@click.argument('channels', nargs=-1)
 @click.pass_context
-def channel(ctx, channel):
-    """[ARG] Channel Name or ID"""
-    ctx.obj = SlackAPI(channel=channel)
-    val = False
-    while not val:
-        status = f'Looking up Slack channel {channel}...'
-        click.secho(status, blink=True, nl=False)
-        val = ctx.obj.complete_channel_info()
+def channel(ctx, channels, channels_file, output_format, refresh):
+    """[ARG] Channel Names or IDs"""
+    channels = [*channels, *(line.strip() for line in channels_file or () if line.strip())]
+    if not channels:
+        raise click.BadParameter('At least one channel name or ID is required.')
+    # Keep status lines out of CSV & JSON output, which is often redirected to a file.
+    err = output_format != 'table'
+    ctx.obj = SlackAPI(channel=channels[0], refresh=refresh)
+    if len(channels) == 1:
+        val = False
+        while not val:
+            status = f'Looking up Slack channel {channels[0]}...'
+            click.secho(status, blink=True, nl=False, err=err)
+            val = ctx.obj.complete_channel_info()
+        vals = [val]
+    else:
+        status = f'Looking up {len(channels)} Slack channels...'
+        click.secho(status, blink=True, nl=False, err=err)
+        vals = ctx.obj.bulk_channel_info(channels)
+    clear_line(status, err=err)
 
-    clear_line(status)
+    for name, val in zip(channels, vals):
+        if not val:
+            click.secho(f'Channel {name} could not be located.', fg='red', err=True)
+    found = [val for val in vals if val]
+    if output_format == 'json':
+        click.echo(json.dumps([{'info': val['info'],
+                                'members': [{'name': name, 'email': email} for name, email in val['members']]}
+                               for val in found], indent=4))
+    elif output_format == 'csv':
+        writer = csv.writer(click.get_text_stream('stdout'))
+        writer.writerow(['channel', 'channel_id', 'type', 'members', 'member_name', 'member_email'])
+        for val in found:
+            info = [val['info']['Name'], val['info']['ID'], val['info']['Type'], val['info']['# of Members']]
+            writer.writerows([*info, name, email] for name, email in val['members'] or [(None, None)])
+    else:
+        for i, val in enumerate(found):
+            echo_channel(val, first=i == 0)
+    if len(channels) > 1:
+        echo_api_stats(ctx.obj)
+
+
+def echo_api_stats(api):
+    """Print calls, throughput & throttling of each Slack API method called to stderr."""
+    stats = api.scheduler.stats()
+    if not stats:
+        return
+    click.secho('\nSlack API: calls, calls/sec, throttled, retries, sec waited', fg='cyan', err=True)
+    for name, counts in stats.items():
+        click.secho(f'{name}: ', fg='cyan', nl=False, err=True)
+        click.secho(f'{counts["calls"]}, {counts["per_second"]}, {counts["throttled"]}, {counts["retries"]}, '
+                    f'{counts["waited"]}', fg='white', err=True)
+
+
+def echo_channel(val, first=True):
+    """Print channel details & members as a table, after a blank line unless it is the first."""
+    if not first:
+        click.echo()
     click.secho('Channel Details:\n⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻', fg='cyan')
     for key, value in val['info'].items():
         click.secho(f'{key}: ', fg='cyan', nl=False)
@@ -105,23 +239,73 @@ def channel(ctx, channel):
 
 
 @cli.command()
-@click.argument('user', required=True)
+@click.option('--users-file',
+              type=click.File(),
+              help='File of user email addresses or IDs, one per line, to look up in a single pass.')
+@click.option('-f', '--format', 'output_format',
+              default='table', show_default=True, type=click.Choice(['table', 'csv', 'json']),
+              help='Output format. User details as a table, one CSV row per user, or JSON.')
+@click.option('--refresh',
+              is_flag=True,
+              help='Skip cached users, refreshing them from the Slack API.')
+@click.argument('users', nargs=-1)
 @click.pass_context
-def user(ctx, user):
-    """[ARG] User Email or ID"""
-    ctx.obj = SlackAPI(user=user)
-    data = False
-    while not data:
-        status = f'Looking up Slack user {user}...'
-        click.secho(status, blink=True, nl=False)
-        if '@' in user:
-            data = ctx.obj.lookup_user_by_email()
+def user(ctx, users, users_file, output_format, refresh):
+    """[ARG] User Emails or IDs"""
+    users = [*users, *(line.strip() for line in users_file or () if line.strip())]
+    if not users:
+        raise click.BadParameter('At least one user email or ID is required.')
+    # Keep status lines out of CSV & JSON output, which is often redirected to a file.
+    err = output_format != 'table'
+    ctx.obj = SlackAPI(user=users[0], refresh=refresh)
+    if len(users) == 1:
+        data = False
+        while not data:
+            status = f'Looking up Slack user {users[0]}...'
+            click.secho(status, blink=True, nl=False, err=err)
+            if '@' in users[0]:
+                data = ctx.obj.lookup_user_by_email()
+            else:
+                data = ctx.obj.lookup_user_by_id()
+        results = [(users[0], data)]
+    else:
+        status = f'Looking up {len(users)} Slack users...'
+        click.secho(status, blink=True, nl=False, err=err)
+        results = ctx.obj.bulk_user_info(users)
+
+    # Users are written as they are found, so large lookups can be followed as they run.
+    writer = csv.writer(click.get_text_stream('stdout'))
+    count = 0
+    for name, data in results:
+        if status:
+            clear_line(status, err=err)
+            status = None
+        if not data:
+            click.secho(f'User {name} could not be found.', fg='red', err=True)
+            continue
+        if output_format == 'json':
+            entry = textwrap.indent(json.dumps({'User': name, **data}, indent=4), '    ')
+            click.echo(f'{"," if count else "["}\n{entry}', nl=False)
+        elif output_format == 'csv':
+            if not count:
+                writer.writerow(['User', *data])
+            writer.writerow([name, *data.values()])
         else:
-            data = ctx.obj.lookup_user_by_id()
-    clear_line(status)
+            echo_user(data, first=not count)
+        count += 1
+    if status:
+        clear_line(status, err=err)
+    if output_format == 'json':
+        click.echo('\n]' if count else '[]')
+    if len(users) > 1:
+        echo_api_stats(ctx.obj)
+
+
+def echo_user(data, first=True):
+    """Print user details as a table, after a blank line unless it is the first."""
+    if not first:
+        click.echo()
     click.secho('User Details:\n⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻⎻', fg='cyan')
     for key, value in data.items():
         click.secho(f'{key}: ', fg='cyan', nl=False)
         click.secho(f'{value}', fg='white')
-
-
@@ -0,0 +1,66 @@
+from array import array
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import click
+
+from slackcli.profiling import PROFILE
+
+
+class Clock:
+    """Class representing the time zone messages are shown in. Local time zone if none given.
+    The zone is resolved once & formatted date, time & zone name are cached per second, so
+    messages posted in the same second are only converted once. The zone is only consulted
+    once per minute, as UTC offsets are whole minutes.
+    """
+    CACHE_SIZE = 1 << 16
+
+    def __init__(self, tz=None):
+        try:
+            self.zone = ZoneInfo(tz) if tz else None
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f'\r{70 * " "}', end='\r', flush=True)
+            raise click.BadParameter(f'Could not locate time zone {tz}.')
+        self.seconds = {}
+        self.minutes = {}
+
+    def localize(self, timestamps):
+        """Return list of (date, time, zone name) of each Slack ts string, converted in one batch."""
+        formatted = []
+        misses = 0
+        for stamp in array('d', map(float, timestamps)):
+            # Round to microseconds first, as datetime.fromtimestamp does.
+            second = round(stamp * 1_000_000) // 1_000_000
+            try:
+                formatted.append(self.seconds[second])
+            except KeyError:
+                misses += 1
+                formatted.append(self.format(second))
+        PROFILE.count('clock_cache_hits', len(formatted) - misses)
+        PROFILE.count('clock_cache_misses', misses)
+        return formatted
+
+    def format(self, second):
+        """Format & cache date, time & zone name of a whole second timestamp."""
+        if len(self.seconds) >= self.CACHE_SIZE:
+            self.seconds.clear()
+        minute, seconds = divmod(second, 60)
+        try:
+            date, hours_minutes, name = self.minutes[minute]
+        except KeyError:
+            local_time = self.local_time(second)
+            if local_time.utcoffset().total_seconds() % 60:
+                return (local_time.strftime('%Y-%m-%d'), local_time.strftime('%H:%M:%S'), local_time.tzname())
+            if len(self.minutes) >= self.CACHE_SIZE:
+                self.minutes.clear()
+            date, hours_minutes, name = self.minutes[minute] = (local_time.strftime('%Y-%m-%d'),
+                                                                local_time.strftime('%H:%M'),
+                                                                local_time.tzname())
+        fields = self.seconds[second] = (date, f'{hours_minutes}:{seconds:02d}', name)
+        return fields
+
+    def local_time(self, second):
+        """Return datetime of whole second timestamp in time zone."""
+        if self.zone:
+            return datetime.fromtimestamp(second, self.zone)
+        return datetime.fromtimestamp(second, timezone.utc).astimezone()
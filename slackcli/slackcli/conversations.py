@@ -1,62 +1,68 @@
 from slackcli.messages import Message
-from slackcli.user import User
+from slackcli.profiling import PROFILE
+from slackcli.user import Participants, User
 
 
 class Conversation:
-    """Class representing a conversation for specific date."""
+    """Class representing a conversation for specific date.
+    Messages are in file order until sort_messages sorts them into threads.
+    """
     def __init__(self, convo, date_obj, file):
         self.convo_id = file[0].split('/')[0]
         self.date_obj = date_obj
-        self.raw_data = convo
         self.set_participants()
-        self.set_messages()
-        self.sort_messages()
+        self.set_messages(convo)
 
     def set_participants(self):
-        """Set conversation participants instance attribute."""
+        """Set conversation participants instance attribute, a registry indexed by ID, username & bot ID."""
         users = [convo['members'] for convo in self.date_obj.convo_type
                  if convo.get('name') == self.convo_id
                  or convo.get('id') == self.convo_id]
-        setattr(self, 'participants', [User(self.date_obj.export.users_json, user_id=user) for user in users[0]])
+        directory = self.date_obj.export.user_directory
+        setattr(self, 'participants', Participants(User(directory, user_id=user) for user in users[0]))
 
-    def set_messages(self):
+    def set_messages(self, convo):
         """Set messages instance attribute with list of Messages in Conversation. Also,
-        set time attribute of message for sorting in conversation."""
-        setattr(self, 'messages', [Message(msg, self) for msg in self.raw_data])
+        set time attribute of message for sorting in conversation. Message timestamps are
+        converted to the export's time zone in one batch. Sender fields are resolved once
+        all messages have added their senders to participants. The number of messages in the
+        file is kept, as threading may drop replies."""
+        setattr(self, 'messages', [Message(msg, self) for msg in convo])
+        self.message_count = len(self.messages)
+        PROFILE.count('messages_parsed', self.message_count)
+        times = self.date_obj.export.clock.localize(msg.ts for msg in self.messages)
+        for msg, (date, time, tz) in zip(self.messages, times):
+            msg.date, msg.time, msg.tz = date, time, tz
         setattr(self, 'time', f'{self.messages[0].time}, {self.messages[0].tz}')
+        for msg in self.messages:
+            msg.resolve_sender()
 
     def sort_messages(self):
-        """Sort and structure messages based on time & thread status."""
+        """Sort and structure messages based on time & thread status.
+        Thread parents & replies are mapped by thread_ts in one pass so each thread is rebuilt in linear time.
+        """
         self.messages.sort(key=lambda msg: msg.ts)
+        parents = {}
+        replies = {}
+        for msg in self.messages:
+            if msg.thread_parent:
+                parents.setdefault(msg.ts, msg)
+            elif msg.thread_ts is not None:
+                replies.setdefault(msg.thread_ts, []).append(msg)
+        parent_ids = {msg.sender_id for msg in self.messages if msg.thread_parent}
+
         resorted_msgs = []
         for msg in self.messages:
             if msg.thread_parent:
                 resorted_msgs.append(msg)
-                for sub_msg in self.messages:
-                    if sub_msg.thread_ts == msg.ts and not sub_msg.thread_parent:
-                        resorted_msgs.append(sub_msg)
+                resorted_msgs.extend(replies.get(msg.ts, []))
             elif msg.thread_child:
-                ids = [msg.sender_id for msg in self.messages
-                       if msg.thread_parent]
                 thread_id = msg.thread_id
-                if not msg.thread_id:
-                    for message in self.messages:
-                        if message.thread_parent and message.ts == msg.thread_ts:
-                            thread_id = message.sender_id
-                            break
-                if thread_id not in ids:
+                if not msg.thread_id and msg.thread_ts in parents:
+                    thread_id = parents[msg.thread_ts].sender_id
+                if thread_id not in parent_ids:
                     resorted_msgs.append(msg)
-                else:
-                    continue
             else:
                 resorted_msgs.append(msg)
 
         self.messages = resorted_msgs
-
-
-
-
-
-
-
-
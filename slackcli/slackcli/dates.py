@@ -2,19 +2,37 @@ from slackcli.conversations import Conversation
 
 
 class Date:
-    """Class representing a specific date."""
-    def __init__(self, export, files, date, convo_type):
+    """Class representing a specific date. Conversations are parsed from streams of each file's
+    messages, if given, else from the files themselves, unless already parsed.
+    """
+    def __init__(self, export, files, date, convo_type, convos=None, streams=None):
         self.export = export
         self.files = files
         self.date = date
         self.convo_type = convo_type
-        self.convos = None
-        self.set_convos()
+        self.convos = convos
+        if self.convos is None:
+            self.set_convos(streams)
         self.convos.sort(key=lambda convo: convo.time)
 
-    def set_convos(self):
-        """Set convos attribute with list of Conversation objects for that instance's date."""
-        self.convos = [Conversation(self.export.open_json_file(file[0]), self, file)
-                       for file in self.files
-                       if self.date == file[1]]
+    def __getstate__(self):
+        """Pickle Date without its Export & convo-type file, which parse workers hold their own copies of."""
+        state = self.__dict__.copy()
+        state['export'] = None
+        state['convo_type'] = None
+        return state
 
+    def restore(self, export, convo_type):
+        """Restore Export & convo-type file of a Date parsed in a worker process. Return Date."""
+        self.export = export
+        self.convo_type = convo_type
+        return self
+
+    def set_convos(self, streams=None):
+        """Set convos attribute with list of Conversation objects for that instance's date.
+        Files are already bucketed to the instance's date by Export.bucket_files_by_date & each
+        file's messages are streamed into its Conversation.
+        """
+        if streams is None:
+            streams = [self.export.iter_json_file(file[0]) for file in self.files]
+        self.convos = [Conversation(stream, self, file) for stream, file in zip(streams, self.files)]
@@ -1,8 +1,11 @@
+import html
 import json
-import re
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from functools import lru_cache
+from functools import cached_property
+from zipfile import ZipFile
 
 import click
 from reportlab.platypus import SimpleDocTemplate
@@ -10,18 +13,39 @@ from reportlab.platypus import Paragraph
 from reportlab.lib.styles import ParagraphStyle
 
 
-from slackcli.user import User
+from slackcli.user import User, UserDirectory
+from slackcli.clock import Clock
 from slackcli.dates import Date
+from slackcli.index import UserIndex, archive_key
+from slackcli.profiling import PROFILE
+from slackcli.store import ExportStore
+from slackcli.stream import iter_json_array
+
+
+CONVO_TITLES = {
+    'dms': 'Direct Message Conversations',
+    'mpims': 'Multi-Party Direct Message Conversations',
+    'channels': 'Public Channel Conversations',
+    'groups': 'Private Channel Conversations'
+}
+
+
+ARCHIVE_PROPERTIES = ('archive_key', 'store', 'user_directory', 'user_index', 'dms_json', 'mpims_json', 'groups_json',
+                      'channels_json', 'channel_names', 'file_list', 'available_dates', 'relevant_dates')
+PARSE_WORKER = {}
+RENDER_WORKER = {}
 
 
 class Export:
     """Export Class: Handles bulk of ZIP file validation and convo object creation."""
-    def __init__(self, email=None, dates=None, channel=None):
+    def __init__(self, email=None, dates=None, channel=None, tz=None):
         self.target_user = None
         self.input_email = email
         self.input_date_range = dates
         self.input_channel = channel
+        self.input_tz = tz
         self.zip_file = None
+        self.pipelines = {}
 
 
     @property
@@ -31,85 +55,131 @@ class Export:
 
     @zip_file.setter
     def zip_file(self, file):
-        """Setter Property: zip_file."""
+        """Setter Property: zip_file. Also sets absolute zip_path for worker processes."""
         self._zip_file = file
+        self.zip_path = os.path.abspath(file.filename) if file else None
 
     @property
-    @lru_cache(maxsize=1)
-    def users_json(self):
-        """Cached Property: users json file."""
-        return self.open_json_file('users.json')
+    def options(self):
+        """Property: input options, to create an identical Export in a worker process."""
+        return self.input_email, self.input_date_range, self.input_channel, self.input_tz
 
-    @property
-    @lru_cache(maxsize=1)
+    def share_archive(self, export):
+        """Share zip_file & archive level properties already resolved by another Export with the same
+        channel & dates, so they are loaded once for every Export of the archive.
+        """
+        self.zip_file = export.zip_file
+        self.input_channel = export.input_channel
+        for name in ARCHIVE_PROPERTIES:
+            if name in export.__dict__:
+                self.__dict__[name] = export.__dict__[name]
+
+    def worker_archive(self):
+        """Return archive level properties already resolved, to share with worker processes. The user
+        directory, which every worker parses messages with, is resolved first. The store & user index
+        hold open handles, so each worker opens its own when needed.
+        """
+        self.user_directory
+        return {name: self.__dict__[name] for name in ARCHIVE_PROPERTIES
+                if name in self.__dict__ and name not in ('store', 'user_index')}
+
+    @cached_property
+    def clock(self):
+        """Cached Property: Clock of input time zone, local time zone if none given."""
+        return Clock(self.input_tz)
+
+    @cached_property
+    def archive_key(self):
+        """Cached Property: key of zip_file from its size & modification time. Locates the store & user
+        index of zip_file without reading the whole archive.
+        """
+        return archive_key(self.zip_path)
+
+    @cached_property
+    def store(self):
+        """Cached Property: parsed export store of zip_file if it has been ingested, else None."""
+        store = ExportStore(self.zip_path, self.archive_key)
+        return store if store.exists else None
+
+    @cached_property
+    def user_directory(self):
+        """Cached Property: users json file indexed for user lookups, streamed one user at a time."""
+        return UserDirectory(self.iter_json_file('users.json'))
+
+    @cached_property
+    def user_index(self):
+        """Cached Property: index of user IDs to the files they appear in. Read from store if ingested."""
+        return self.store if self.store else UserIndex(self.zip_file, self.archive_key)
+
+    @cached_property
     def dms_json(self):
         """Cached Property: dms json file."""
         return self.open_json_file('dms.json')
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def mpims_json(self):
         """Cached Property: mpims json file."""
         return self.open_json_file('mpims.json')
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def groups_json(self):
         """Cached Property: groups json file."""
         return self.open_json_file('groups.json')
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def channels_json(self):
         """Cached Property: channels json file."""
         return self.open_json_file('channels.json')
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
+    def channel_names(self):
+        """Cached Property: public & private channel names indexed by name and ID."""
+        names = {}
+        for channel in [*self.channels_json, *self.groups_json]:
+            names.setdefault(channel['name'], channel['name'])
+            names.setdefault(channel['id'], channel['name'])
+        return names
+
+    @cached_property
     def dms_files(self):
         """Cached Property: relevant dms files."""
         return self.parse_dms_mpims_files(self.dms_json)
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def mpims_files(self):
         """Cached Property: relevant mpims files."""
         return self.parse_dms_mpims_files(self.mpims_json)
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def channels_files(self):
         """Cached Property: relevant channel files."""
         return self.parse_group_channel_files(self.channels_json)
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def groups_files(self):
         """Cached Property: relevant group files."""
         return self.parse_group_channel_files(self.groups_json)
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def file_list(self):
         """Cached Property: all json files in zip_file or all json files of specified channel."""
+        names = self.store.members(self.input_channel) if self.store else self.zip_file.namelist()
         if not self.input_channel:
-            files = sorted((file, file.split('/')[1].split('.')[0]) for file in self.zip_file.namelist()
+            files = sorted((file, file.split('/')[1].split('.')[0]) for file in names
                            if '/' in file and file.endswith('.json'))
         else:
-            files = sorted((file, file.split('/')[1].split('.')[0]) for file in self.zip_file.namelist()
+            files = sorted((file, file.split('/')[1].split('.')[0]) for file in names
                            if file.startswith(f'{self.input_channel}/') and file.endswith('.json'))
         return files
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def available_dates(self):
         """Cached Property: All available dates in file_list property."""
         dates = sorted({file[1] for file in self.file_list})
         dates = [datetime.strptime(date, '%Y-%m-%d') for date in dates]
         return dates
 
-    @property
-    @lru_cache(maxsize=1)
+    @cached_property
     def relevant_dates(self):
         """Cached Property: All relevant dates within specified date range."""
         try:
@@ -120,25 +190,39 @@ class Export:
         return dates
 
     @staticmethod
-    def parse_dates_from_files(files):
-        """Parse & sort dates from file names."""
-        dates = sorted({date[1] for date in files})
-        return dates
+    def bucket_files_by_date(files):
+        """Group files by date in a single pass.
+        Return dict of date to files sorted by date, with each date's files in channel order.
+        """
+        buckets = {}
+        for file in sorted(files):
+            buckets.setdefault(file[1], []).append(file)
+        return {date: buckets[date] for date in sorted(buckets)}
 
     def open_json_file(self, file):
-        """Open JSON file."""
+        """Open JSON file. Read from store if zip_file has been ingested."""
+        return list(self.iter_json_file(file))
+
+    def iter_json_file(self, file):
+        """Generate each item of JSON file, decoded incrementally from the zip stream.
+        Read from store if zip_file has been ingested.
+        """
+        PROFILE.count('members_opened')
+        if self.store:
+            yield from self.store.iter_load(file)
+            return
         with self.zip_file.open(file) as json_file:
-            data = json_file.read()
-            return json.loads(data)
+            yield from iter_json_array(json_file)
 
     def parse_group_channel_files(self, json_file):
         """Parse relevant Group & Channel files."""
-        channels = [channel['name'] for channel in json_file]
+        channels = {channel['name'] for channel in json_file}
         files = self.file_list
         if self.input_email:
+            user_files = self.user_index.files(self.target_user.user_id)
             files = [file for file in files
                      if file[0].split('/')[0] in channels
-                     and re.search(self.target_user.user_id, json.dumps(self.open_json_file(file[0])))]
+                     and file[0] in user_files]
             if not files:
                 print(f'\r{70 * " "}', end='\r', flush=True)
                 raise click.BadParameter(f'User {self.input_email} was not active in channel {self.input_channel}.')
@@ -169,21 +253,25 @@ class Export:
                  if datetime.strptime(file[1], '%Y-%m-%d') in self.relevant_dates]
         return files
 
+    @PROFILE.timed('validate')
     def validate_input(self):
-        """Validate input for user, channel, and dates options."""
+        """Validate input for user, channel, dates, and time zone options."""
+        if self.input_tz:
+            self.clock
+
         if self.input_email:
-            if not re.search(self.input_email, json.dumps(self.users_json)):
+            position = self.user_directory.emails.get(self.input_email.lower())
+            if position is None:
                 print(f'\r{70 * " "}', end='\r', flush=True)
                 raise click.BadParameter(f'Could not locate {self.input_email} in users file.')
-            id = next((user['id'] for user in self.users_json
-                       if user['profile'].get('email', '').lower() == self.input_email))
-            self.target_user = User(self.users_json, user_id=id, email=self.input_email)
+            id = self.user_directory.users[position]['id']
+            self.target_user = User(self.user_directory, user_id=id, email=self.input_email)
 
         if self.input_channel:
-            if (not re.search(self.input_channel, json.dumps(self.channels_json))
-                    and not re.search(self.input_channel, json.dumps(self.groups_json))):
+            if self.input_channel not in self.channel_names:
                 print(f'\r{70 * " "}', end='\r', flush=True)
                 raise click.BadParameter(f'Could not locate {self.input_channel} in channels file.')
+            self.input_channel = self.channel_names[self.input_channel]
 
         if self.input_date_range:
             for date in self.input_date_range:
@@ -194,23 +282,332 @@ class Export:
                     raise click.BadParameter((f'Inputted date range is not within Export date range of '
                                               f'{self.available_dates[0].date()}-{self.available_dates[-1].date()}'))
 
-    def create_convo_objects(self, files_list):
-        """Create objects for all convos. Object structure: Date > Convo > Message.
-        Set instance attributes to OBJs based off of convo-type. ie. dms, mpims, group, channel.
+    def create_convo_objects(self, files_list, jobs=1):
+        """Plan the pipeline of each convo-type with relevant files. ie. dms, mpims, group, channel.
+        Pipelines are generators, so no Date OBJ is built until rendering pulls it.
         """
-        for file in files_list:
-            files = getattr(self, f'{file}_files')
-            if not files:
+        self.pipelines = {convo_type: self.pipeline(convo_type, jobs=jobs)
+                          for convo_type in files_list if getattr(self, f'{convo_type}_files')}
+
+    def pipeline(self, convo_type, files=None, jobs=1):
+        """Generate Date OBJs of a convo-type through each stage: list files > decode > normalize > thread.
+        Every stage is a generator, so only the Date being rendered is held in memory. Files default
+        to the relevant files of the convo-type. With more than 1 job, Dates are parsed by a pool of
+        worker processes.
+        """
+        buckets = self.list_files(convo_type, files)
+        if jobs > 1 and len(buckets) > 1:
+            return self.parse_date_objects(buckets, convo_type, jobs)
+        return self.thread(self.normalize(self.decode(buckets), convo_type))
+
+    @PROFILE.timed('list_files')
+    def list_files(self, convo_type, files=None):
+        """Stage: Return relevant files of a convo-type bucketed by date."""
+        return self.bucket_files_by_date(getattr(self, f'{convo_type}_files') if files is None else files)
+
+    def decode(self, buckets):
+        """Stage: Generate files of each date with a stream of each file's decoded messages."""
+        for date, files in buckets.items():
+            yield date, files, [PROFILE.stream('decode', self.iter_json_file(file[0])) for file in files]
+
+    def normalize(self, days, convo_type):
+        """Stage: Generate Date OBJ of each date with Conversations parsed from decoded messages."""
+        convo_json = getattr(self, f'{convo_type}_json')
+        for date, files, streams in days:
+            with PROFILE.stage('normalize'):
+                day = Date(self, files, date, convo_json, streams=streams)
+            yield day
+
+    @staticmethod
+    def thread(days):
+        """Stage: Generate each Date OBJ with messages of its Conversations sorted into threads."""
+        for day in days:
+            with PROFILE.stage('thread'):
+                for convo in day.convos:
+                    convo.sort_messages()
+            yield day
+
+    def parse_date_objects(self, buckets, convo_type, jobs):
+        """Generate Date OBJs parsed by worker processes, each with its own handle on the ZIP file.
+        At most 2 Dates per worker are in flight & Dates are yielded in date order. Only the wait for
+        each Date is profiled.
+        """
+        convo_json = getattr(self, f'{convo_type}_json')
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_parse_worker,
+                                 initargs=(self.zip_path, self.options, self.worker_archive())) as executor:
+            pending = deque()
+            for date, files in buckets.items():
+                pending.append(executor.submit(parse_date, convo_type, date, files))
+                if len(pending) >= 2 * jobs:
+                    yield self.parse_result(pending.popleft(), convo_json)
+            while pending:
+                yield self.parse_result(pending.popleft(), convo_json)
+
+    @PROFILE.timed('parse_wait')
+    def parse_result(self, future, convo_json):
+        """Return Date OBJ of finished parse task."""
+        return future.result().restore(self, convo_json)
+
+
+class FlowableStream:
+    """Class representing a lazily filled list of flowables for SimpleDocTemplate.build.
+    Flowables are pulled from a generator only as the build consumes them. Length is the
+    number of flowables pulled so far & is only 0 once the generator is exhausted.
+    """
+    def __init__(self, flowables):
+        self.flowables = iter(flowables)
+        self.buffer = []
+
+    def fill(self, size=None):
+        """Pull flowables into buffer until it holds size flowables or generator is exhausted."""
+        while size is None or len(self.buffer) < size:
+            try:
+                self.buffer.append(next(self.flowables))
+            except StopIteration:
+                break
+
+    def fill_index(self, index):
+        """Pull flowables into buffer so that index (int or slice) can be resolved."""
+        if isinstance(index, slice):
+            stop = index.stop
+        else:
+            stop = index + 1 if index >= 0 else None
+        self.fill(stop if stop is None or stop >= 0 else None)
+
+    def __len__(self):
+        self.fill(1)
+        return len(self.buffer)
+
+    def __getitem__(self, index):
+        self.fill_index(index)
+        return self.buffer[index]
+
+    def __setitem__(self, index, value):
+        self.fill_index(index)
+        self.buffer[index] = value
+
+    def __delitem__(self, index):
+        self.fill_index(index)
+        del self.buffer[index]
+
+    def insert(self, index, value):
+        """Insert flowable before index."""
+        self.fill_index(index)
+        self.buffer.insert(index, value)
+
+
+class Renderer(Export):
+    """Renderer Class. Interface for output formats rendered from the Date > Convo > Message OBJs.
+    Subclasses set extension & implement render_file.
+    """
+    extension = None
+    progress = None
+
+    def render(self, convo_types):
+        """Render an output file for each convo-type. Convo-types finished by an earlier run are skipped."""
+        for convo_type in convo_types:
+            if convo_type not in self.pipelines or self.unit_done(convo_type):
                 continue
-            dates = self.parse_dates_from_files(files)
-            objects = [Date(self, files, date, getattr(self, f'{file}_json')) for date in dates]
-            setattr(self, file, objects)
+            with PROFILE.stage('render'):
+                self.render_file(convo_type, convo_type, self.pipelines[convo_type])
+            self.unit_complete(convo_type, convo_type, getattr(self, f'{convo_type}_files'))
+
+    def unit_done(self, name):
+        """Return True if output file name was finished by an earlier run of the export."""
+        return self.progress is not None and self.progress.done(name)
+
+    def unit_complete(self, name, convo_type, files):
+        """Record output file name as finished in progress manifest."""
+        if self.progress is not None:
+            self.progress.complete(name, f'{name}.{self.extension}', convo_type, files)
+
+    def render_file(self, name, convo_type, days):
+        """Render days of a convo-type to output file name."""
+        raise NotImplementedError
+
+    def records(self, convo_type, days):
+        """Generate a flat dict record for each message, built one day at a time."""
+        for day in days:
+            for convo in day.convos:
+                participants = [user.full_name for user in convo.participants]
+                PROFILE.count('records_written', len(convo.messages))
+                for msg in convo.messages:
+                    yield {
+                        'convo_type': convo_type,
+                        'date': day.date,
+                        'conversation': convo.convo_id,
+                        'participants': participants,
+                        'ts': msg.ts,
+                        'time': msg.time,
+                        'tz': str(msg.tz),
+                        'sender_id': msg.sender_id,
+                        'sender_name': msg.sender_full_name,
+                        'sender_email': msg.sender_email,
+                        'sender_username': msg.sender_user_name,
+                        'sender_status': msg.sender_status,
+                        'thread_ts': msg.thread_ts,
+                        'thread_child': msg.thread_child,
+                        'edited': msg.edited,
+                        'deleted': bool(msg.deleted),
+                        'original': msg.original,
+                        'text': html.unescape(msg.reactions_added(self.target_user).replace('<br/>', '\n'))
+                    }
+
+    def plan_volumes(self, convo_type, split, volume_size):
+        """Split relevant files of a convo-type into volumes by month, channel or message count.
+        Message counts are read from the store. Return list of volume dicts with output name, files,
+        and date range.
+        """
+        files = getattr(self, f'{convo_type}_files')
+        groups = {}
+        if split == 'month':
+            for file in sorted(files, key=lambda file: file[1]):
+                groups.setdefault(file[1][:7], []).append(file)
+        elif split == 'channel':
+            for file in files:
+                groups.setdefault(file[0].split('/')[0], []).append(file)
+        else:
+            counts = self.store.message_counts()
+            label, count = 1, 0
+            for file in sorted(files, key=lambda file: file[1]):
+                if count >= volume_size:
+                    label, count = label + 1, 0
+                count += counts.get(file[0], 0)
+                groups.setdefault(f'{label:03d}', []).append(file)
+        volumes = [self.volume(convo_type, f'{convo_type}_{label}', volume_files)
+                   for label, volume_files in groups.items()]
+        return volumes
+
+    @staticmethod
+    def volume(convo_type, name, files):
+        """Return volume dict with output name, files, and date range."""
+        return {'convo_type': convo_type,
+                'name': name,
+                'files': files,
+                'start': min(file[1] for file in files),
+                'end': max(file[1] for file in files)}
+
+    def render_volumes(self, convo_types, split, volume_size, jobs):
+        """Render volumes for each convo-type in parallel worker processes, skipping volumes finished
+        by an earlier run. Render an index listing each volume & its date range. Without a store,
+        volumes split by message count are rendered in turn from a single parse of each convo-type.
+        """
+        if split == 'messages' and not self.store:
+            volumes = [volume for convo_type in convo_types
+                       if getattr(self, f'{convo_type}_files')
+                       for volume in self.render_message_volumes(convo_type, volume_size, jobs)]
+            self.render_index(volumes)
+            return
+        volumes = [volume for convo_type in convo_types
+                   if getattr(self, f'{convo_type}_files')
+                   for volume in self.plan_volumes(convo_type, split, volume_size)]
+        pending = [volume for volume in volumes if not self.unit_done(volume['name'])]
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=init_render_worker,
+                                     initargs=(type(self), self.zip_path, self.options,
+                                               self.worker_archive())) as executor:
+                futures = {executor.submit(render_volume, volume): volume for volume in pending}
+                for future in as_completed(futures):
+                    future.result()
+                    volume = futures[future]
+                    self.unit_complete(volume['name'], volume['convo_type'], volume['files'])
+        else:
+            for volume in pending:
+                self.render_volume(volume)
+                self.unit_complete(volume['name'], volume['convo_type'], volume['files'])
+        self.render_index(volumes)
+
+    def render_message_volumes(self, convo_type, volume_size, jobs):
+        """Render volumes of a convo-type split by message count from one pass of its pipeline, so each
+        file is decoded once. Messages are counted as files are parsed & a volume ends once it holds
+        volume_size messages. Return list of volumes. Volumes finished by an earlier run are parsed but
+        not rendered again, as their files are only known once parsed.
+        """
+        units = ((day, file, convo) for day in self.pipeline(convo_type, jobs=jobs)
+                 for file, convo in self.day_units(day))
+        volumes = []
+        unit = next(units, None)
+        while unit:
+            name = f'{convo_type}_{len(volumes) + 1:03d}'
+            files = []
+            days = self.volume_days(unit, units, files, volume_size)
+            done = self.unit_done(name)
+            if not done:
+                with PROFILE.stage('render'):
+                    self.render_file(name, convo_type, days)
+            deque(days, maxlen=0)
+            volumes.append(self.volume(convo_type, name, files))
+            if not done:
+                self.unit_complete(name, convo_type, files)
+            unit = next(units, None)
+        return volumes
 
+    @staticmethod
+    def day_units(day):
+        """Return list of (file, Conversation) of each file of Date OBJ, in file order."""
+        convos = {convo.convo_id: convo for convo in day.convos}
+        return [(file, convos[file[0].split('/')[0]]) for file in day.files]
+
+    def volume_days(self, unit, units, files, volume_size):
+        """Generate Date OBJs of a volume from unit & the (Date, file, Conversation) units after it,
+        adding each file to files, until the volume holds volume_size messages. A Date split between
+        volumes is rebuilt with the files of each.
+        """
+        count = 0
+        day, day_files, convos = unit[0], [], []
+        while unit:
+            if unit[0] is not day:
+                yield self.part_of_day(day, day_files, convos)
+                day, day_files, convos = unit[0], [], []
+            day_files.append(unit[1])
+            convos.append(unit[2])
+            files.append(unit[1])
+            count += unit[2].message_count
+            if count >= volume_size:
+                break
+            unit = next(units, None)
+        yield self.part_of_day(day, day_files, convos)
+
+    def part_of_day(self, day, files, convos):
+        """Return Date OBJ holding only the Conversations of files, or day itself if it holds them all."""
+        if len(files) == len(day.files):
+            return day
+        return Date(self, files, day.date, day.convo_type, convos)
+
+    def render_volume(self, volume):
+        """Render a single volume to its output file."""
+        convo_type = volume['convo_type']
+        with PROFILE.stage('render'):
+            self.render_file(volume['name'], convo_type, self.pipeline(convo_type, volume['files']))
+        return volume['name']
+
+    def render_index(self, volumes):
+        """Write index.json manifest of volumes with their file, convo-type & date range."""
+        index = [{'file': f'{volume["name"]}.{self.extension}',
+                  'convo_type': volume['convo_type'],
+                  'start': volume['start'],
+                  'end': volume['end'],
+                  'conversation_days': len(volume['files'])}
+                 for volume in volumes]
+        with open('index.json', 'w') as index_file:
+            json.dump(index, index_file, indent=4)
 
-class Pdf(Export):
+    @staticmethod
+    def make_dir():
+        """Create directory on desktop of user for output files."""
+        desktop = f'{os.path.expanduser("~")}/Desktop'
+        slack_dir = f'{desktop}/Slack Output'
+        os.makedirs(slack_dir, exist_ok=True)
+        os.chdir(slack_dir)
+        click.launch(slack_dir)
+
+
+class Pdf(Renderer):
     """PDF Class. Handles creation of PDFs."""
-    def __init__(self, email=None, date=None, channel=None):
-        super().__init__(email, date, channel)
+    extension = 'pdf'
+
+    def __init__(self, email=None, date=None, channel=None, tz=None):
+        super().__init__(email, date, channel, tz)
         self.date_heading_style = ParagraphStyle('heading', fontSize=18, leading=16, fontName='Helvetica-Bold')
         self.msg_heading_style = ParagraphStyle('msg_heading', fontSize=11, leading=14, fontName='Helvetica-Bold')
         self.msg_info_style = ParagraphStyle('msg_title', fontSize=9, leading=10, fontName='Helvetica-BoldOblique')
@@ -225,13 +622,7 @@ class Pdf(Export):
     @staticmethod
     def date_heading(convo_type, date):
         """Create PDF page heading based on convo-type."""
-        title = {
-            'dms': 'Direct Message Conversations',
-            'mpims': 'Multi-Party Direct Message Conversations',
-            'channels': 'Public Channel Conversations',
-            'groups': 'Private Channel Conversations'
-        }
-        return f"<br/>{date} - {title[convo_type]}<br/><br/><br/>"
+        return f"<br/>{date} - {CONVO_TITLES[convo_type]}<br/><br/><br/>"
 
     @staticmethod
     def msg_heading(convo, convo_type):
@@ -264,10 +655,9 @@ class Pdf(Export):
             msg_info = f'&nbsp&nbsp&nbsp&nbsp [THREAD RES.] {msg_info}'
         return msg_info
 
-    @staticmethod
-    def msg_body(msg):
-        """Construct body of message."""
-        msg_body = f'» {msg.text}<br/><br/>'
+    def msg_body(self, msg):
+        """Construct body of message, noting reactions added by the target user."""
+        msg_body = f'» {msg.reactions_added(self.target_user)}<br/><br/>'
         if msg.thread_child:
             msg_body = f'&nbsp&nbsp&nbsp&nbsp{msg_body}'
         return msg_body
@@ -280,37 +670,75 @@ class Pdf(Export):
         msg_body_pg = Paragraph(msg_body, self.msg_body_style)
         return msg_info_pg, msg_body_pg
 
+    def pdf_flowables(self, convo_type, days):
+        """Generate PDF paragraphs for each day of a convo-type.
+        Days are built & dropped one at a time as paragraphs are consumed.
+        """
+        for day in days:
+            date_heading = self.date_heading(convo_type, day.date)
+            yield Paragraph(date_heading, self.date_heading_style)
+            for convo in day.convos:
+                msg_heading = self.msg_heading(convo, convo_type)
+                yield Paragraph(msg_heading, self.msg_heading_style)
+                for msg in convo.messages:
+                    yield from self.msg_pg(msg)
+
+    def render_file(self, name, convo_type, days):
+        """Build PDF file name from days of a convo-type."""
+        pdf = self.create_blank_pdf(name)
+        pdf.build(FlowableStream(self.pdf_flowables(convo_type, days)))
+        PROFILE.count('pages_rendered', pdf.page)
+
     def print_pdf(self, convo_types):
         """Format & print PDF files for each convo-type."""
-        for convo_type in convo_types:
-            try:
-                convo_attr = getattr(self, convo_type)
-            except AttributeError:
-                continue
-            else:
-                pdf = self.create_blank_pdf(convo_type)
-                setattr(self, 'pdf_content', [])
-                for day in convo_attr:
-                    date_heading = self.date_heading(convo_type, day.date)
-                    date_heading_pg = Paragraph(date_heading, self.date_heading_style)
-                    self.pdf_content.append(date_heading_pg)
-                    for convo in day.convos:
-                        msg_heading = self.msg_heading(convo, convo_type)
-                        msg_heading_pg = Paragraph(msg_heading, self.msg_heading_style)
-                        self.pdf_content.append(msg_heading_pg)
-                        for msg in convo.messages:
-                            msg_info_pg, msg_body_pg = self.msg_pg(msg)
-                            self.pdf_content.append(msg_info_pg)
-                            self.pdf_content.append(msg_body_pg)
-
-                pdf.build(self.pdf_content)
-
-    @staticmethod
-    def make_dir():
-        """Create directory on desktop of user for PDF files."""
-        desktop = f'{os.path.expanduser("~")}/Desktop'
-        slack_dir = f'{desktop}/Slack Output'
-        os.makedirs(slack_dir, exist_ok=True)
-        os.chdir(slack_dir)
-        click.launch(slack_dir)
-
+        self.render(convo_types)
+
+    def render_index(self, volumes):
+        """Print index PDF of volumes with their convo-type & date range."""
+        pdf = self.create_blank_pdf('index')
+        content = [Paragraph('<br/>Export Volumes<br/><br/><br/>', self.date_heading_style)]
+        for volume in volumes:
+            title = CONVO_TITLES[volume['convo_type']]
+            content.append(Paragraph(f'{volume["name"]}.pdf', self.msg_heading_style))
+            content.append(Paragraph(f'{title}, {volume["start"]} - {volume["end"]}, '
+                                     f'{len(volume["files"])} conversation days<br/><br/>', self.msg_body_style))
+        pdf.build(content)
+
+
+def init_worker():
+    """Turn off profiling inherited by a forked worker process. Only the main process is profiled."""
+    PROFILE.stop()
+
+
+def init_parse_worker(zip_path, options, archive):
+    """Open ZIP file & validate input once in each parse worker process. Archive level properties
+    resolved by the main process are shared, so the users & channels files are not read again.
+    """
+    init_worker()
+    export = PARSE_WORKER['export'] = Export(*options)
+    export.zip_file = ZipFile(zip_path)
+    export.__dict__.update(archive)
+    export.validate_input()
+
+
+def parse_date(convo_type, date, files):
+    """Parse Date OBJ of a convo-type in a parse worker process."""
+    export = PARSE_WORKER['export']
+    return next(export.thread(export.normalize(export.decode({date: files}), convo_type)))
+
+
+def init_render_worker(renderer, zip_path, options, archive):
+    """Create renderer with its own handle on the ZIP file once in each render worker process.
+    Archive level properties resolved by the main process are shared, so input is validated
+    without reading the users & channels files again.
+    """
+    init_worker()
+    export = RENDER_WORKER['export'] = renderer(*options)
+    export.zip_file = ZipFile(zip_path)
+    export.__dict__.update(archive)
+    export.validate_input()
+
+
+def render_volume(volume):
+    """Render a single volume in a render worker process."""
+    return RENDER_WORKER['export'].render_volume(volume)
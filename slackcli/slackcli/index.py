@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import re
+
+from slackcli.stream import iter_json_array
+
+
+MENTION = re.compile(r'<@([A-Z0-9]+)')
+USER_KEYS = {'user', 'bot_id', 'parent_user_id', 'edited_by', 'deleted_by', 'inviter'}
+USER_LIST_KEYS = {'users', 'reply_users'}
+
+
+def archive_digest(path, chunk_size=1024 * 1024):
+    """Return SHA-256 hex digest of file contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def archive_key(path):
+    """Return hex key of file from its size & modification time. Locates files saved next to an
+    archive without reading it, & changes whenever the archive is replaced or modified.
+    """
+    stat = os.stat(path)
+    return hashlib.sha256(f'{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()
+
+
+class UserIndex:
+    """Class representing an inverted index of user IDs to the ZIP member files they appear in.
+    Built in a single pass over the archive & saved next to the ZIP, keyed by the archive's key.
+    """
+    def __init__(self, zip_file, key):
+        self.zip_file = zip_file
+        self.zip_path = os.path.abspath(zip_file.filename)
+        self.key = key
+        self.users = None
+        if not self.load():
+            self.build()
+            self.save()
+
+    @property
+    def path(self):
+        """Property: index file path next to the ZIP file."""
+        return f'{self.zip_path}.{self.key[:16]}.index.json'
+
+    def files(self, user_id):
+        """Return set of member files user ID appears in."""
+        return set(self.users.get(user_id, ()))
+
+    def load(self):
+        """Load saved index for this archive if present. Return load status."""
+        try:
+            with open(self.path) as index_file:
+                data = json.load(index_file)
+        except (OSError, ValueError):
+            return False
+        if data.get('key') != self.key:
+            return False
+        self.users = data['users']
+        return True
+
+    def save(self):
+        """Save index next to ZIP file. Index is skipped if location is not writable."""
+        try:
+            with open(self.path, 'w') as index_file:
+                json.dump({'key': self.key, 'users': self.users}, index_file)
+        except OSError:
+            pass
+
+    def build(self):
+        """Decode each member file once, one message at a time, & record the user IDs found in it."""
+        users = {}
+        for file in self.zip_file.namelist():
+            if '/' not in file or not file.endswith('.json'):
+                continue
+            ids = set()
+            with self.zip_file.open(file) as json_file:
+                for msg in iter_json_array(json_file):
+                    self.user_ids(msg, ids)
+            for user_id in ids:
+                users.setdefault(user_id, []).append(file)
+        self.users = users
+
+    @classmethod
+    def user_ids(cls, data, ids=None):
+        """Return set of user IDs appearing in data as authors, mentions, reactors or thread parents."""
+        ids = set() if ids is None else ids
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key in USER_KEYS and isinstance(value, str):
+                    ids.add(value)
+                elif key in USER_LIST_KEYS and isinstance(value, list):
+                    ids.update(id for id in value if isinstance(id, str))
+                elif key == 'text' and isinstance(value, str):
+                    ids.update(MENTION.findall(value))
+                else:
+                    cls.user_ids(value, ids)
+        elif isinstance(data, list):
+            for item in data:
+                cls.user_ids(item, ids)
+        return ids
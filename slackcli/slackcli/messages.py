@@ -1,446 +1,221 @@
-from datetime import datetime, timezone
-from functools import lru_cache
+import re
 from slackcli.user import User
 
 
+MISSING = object()
+SLACK_MARKUP = re.compile(r'<(@|!subteam\^|!|https?:|mailto:)([^<>]*)>')
 
-class Message:
-    """Class representing a message in a specific conversation."""
-    def __init__(self, msg, convo_obj):
-        self.raw_data = msg
-        self.convo_obj = convo_obj
-        self.append_user_to_convo()
-
-    def append_user_to_convo(self):
-        """Append user to convo participants if not already present."""
-        for user in self.convo_obj.participants:
-            if (user.user_id == self.sender_id and not user.full_name
-                    or user.user_id != self.sender_id and user.user_name == self.sender_user_name
-                    or self.sender_id and self.sender_id == user.bot_id and self.sender_id != user.user_id):
-                self.convo_obj.participants.remove(user)
-                break
-        bot_ids = [user.bot_id for user in self.convo_obj.participants]
-        user_ids = [user.user_id for user in self.convo_obj.participants]
-        users = [*bot_ids, *user_ids]
-        if self.sender_id not in users:
-            user = User(self.convo_obj.date_obj.export.users_json,
-                        user_id=self.sender_id,
-                        username=self.sender_full_name)
-            self.convo_obj.participants.append(user)
-
-    @property
-    @lru_cache(maxsize=1)
-    def sender_id(self):
-        """Cached Property: Sender ID."""
-        id = None
-        for user in self.convo_obj.participants:
-            if self.sender_user_name and self.sender_user_name == user.user_name:
-                id = user.user_id
-                break
-        if not id:
-            if self.raw_data.get('user') or self.raw_data.get('bot_id'):
-                try:
-                    id = self.raw_data['user']
-                except KeyError:
-                    id = self.raw_data['bot_id']
 
-            else:
-                try:
-                    id = self.raw_data['original']['user']
-                except KeyError:
-                    try:
-                        id = self.raw_data['original']['bot_id']
-                    except KeyError:
-                        try:
-                            id = self.raw_data['message']['user']
-                        except KeyError:
-                            try:
-                                id = self.raw_data['message']['bot_id']
-                            except KeyError:
-                                id = None
-        return id
+def lookup(data, *paths, default=None):
+    """Return value at first key path present in data, else default."""
+    for path in paths:
+        value = data
+        try:
+            for key in path:
+                value = value[key]
+        except (KeyError, IndexError):
+            continue
+        return value
+    return default
 
-    @property
-    @lru_cache(maxsize=1)
-    def sender_full_name(self):
-        """Cached Property: Sender full name."""
-        name = None
-        for user in self.convo_obj.participants:
-            if self.sender_id == user.user_id and user.full_name:
-                name = user.full_name
-                break
-        if not name:
-            try:
-                name = self.raw_data['user_profile']['real_name']
-            except KeyError:
-                try:
-                    name = self.raw_data['original']['user_profile']['real_name']
-                except KeyError:
-                    try:
-                        name = self.raw_data['username']
-                        for user in self.convo_obj.participants:
-                            if user.user_name == name:
-                                name = user.full_name
-                    except KeyError:
-                        try:
-                            name = self.raw_data['original']['username']
-                            for user in self.convo_obj.participants:
-                                if user.user_name == name:
-                                    name = user.full_name
-                        except KeyError:
-                            name = None
-        return name
 
-    @property
-    @lru_cache(maxsize=1)
-    def sender_user_name(self):
-        """Cached Property: Sender username."""
-        try:
-            name = self.raw_data['user_profile']['name']
-        except KeyError:
-            try:
-                name = self.raw_data['username']
-            except KeyError:
-                try:
-                    name = self.raw_data['original']['username']
-                except KeyError:
-                    try:
-                        name = self.raw_data['message']['username']
-                    except KeyError:
-                        name = None
-        return name
+class Message:
+    """Class representing a message in a specific conversation.
+    Fields are resolved from the raw message in one pass on creation. Sender fields that depend on
+    the conversation participants are resolved by resolve_sender once all messages are added & date,
+    time & tz are set by the conversation, which converts the timestamps of all its messages in one batch.
+    """
+    __slots__ = ('convo_obj', 'sender_id', 'sender_user_name', 'sender_full_name', 'sender_email',
+                 'sender_status', 'raw_sender_id', 'profile_full_name', 'posted_user_name', 'text', 'ts',
+                 'date', 'time', 'tz', 'thread', 'thread_ts', 'thread_parent',
+                 'thread_child', 'thread_id', 'original', 'original_ts', 'edited', 'edited_ts', 'edited_by',
+                 'deleted', 'deleted_ts', 'deleted_by', 'reactors')
 
-    @property
-    @lru_cache(maxsize=1)
-    def sender_email(self):
-        """Cached Property: Sender email."""
-        email = None
-        for user in self.convo_obj.participants:
-            if user.user_id == self.sender_id:
-                email = user.email
-                break
-        return email
+    def __init__(self, msg, convo_obj):
+        self.convo_obj = convo_obj
+        self.parse(msg)
+        self.append_user_to_convo()
 
-    @property
-    @lru_cache(maxsize=1)
-    def sender_status(self):
-        """Cached Property: Sender Slack status."""
-        status = None
-        for user in self.convo_obj.participants:
-            if (self.sender_id == user.user_id
-                    or self.sender_full_name == user.full_name
-                    or self.sender_user_name == user.user_name):
-                status = user.status
-                break
-        return status
+    def parse(self, msg):
+        """Resolve message fields from raw message data."""
+        if msg.get('user') or msg.get('bot_id'):
+            self.raw_sender_id = msg['user'] if 'user' in msg else msg['bot_id']
+        else:
+            self.raw_sender_id = lookup(msg, ('original', 'user'), ('original', 'bot_id'),
+                                        ('message', 'user'), ('message', 'bot_id'))
+        self.sender_user_name = lookup(msg, ('user_profile', 'name'), ('username',),
+                                       ('original', 'username'), ('message', 'username'))
+        self.profile_full_name = lookup(msg, ('user_profile', 'real_name'),
+                                        ('original', 'user_profile', 'real_name'), default=MISSING)
+        self.posted_user_name = lookup(msg, ('username',), ('original', 'username'), default=MISSING)
+        self.sender_id = self.raw_sender_id
+        self.sender_full_name = None
+        self.sender_email = None
+        self.sender_status = None
+
+        self.original = True if msg.get('original') else False
+        self.original_ts = lookup(msg, ('original', 'ts'))
+        self.edited = (True if msg.get('edited')
+                       else True if msg.get('message', {}).get('edited')
+                       else False)
+        self.edited_ts = lookup(msg, ('edited', 'ts'), ('message', 'edited', 'ts'))
+        self.edited_by = lookup(msg, ('edited', 'user'), ('edited_by',))
+        self.deleted_ts = lookup(msg, ('deleted_ts',))
+        self.deleted_by = lookup(msg, ('deleted_by',))
+        self.deleted = True if msg.get('deleted_by') else True if msg.get('deleted_ts') else None
+
+        self.thread = (True if msg.get('reply_count')
+                       else True if msg.get('thread_ts')
+                       else True if msg.get('message', {}).get('thread_ts')
+                       else False)
+        self.thread_ts = lookup(msg, ('thread_ts',), ('message', 'thread_ts'))
+        self.ts = self.parse_ts(msg)
+        self.thread_parent = True if self.ts == self.thread_ts else False
+        self.thread_child = True if self.thread and self.ts != self.thread_ts else False
+        self.thread_id = (lookup(msg, ('parent_user_id',), ('message', 'parent_user_id'),
+                                 ('original', 'parent_user_id'), ('root', 'user'))
+                          if self.thread_child else None)
+
+        self.reactors = frozenset(id for reaction in msg.get('reactions') or () for id in reaction.get('users', ()))
+        self.date = None
+        self.time = None
+        self.tz = None
+        self.text = self.parse_text(msg)
+
+    def parse_ts(self, msg):
+        """Return message timestamp. Original or edited timestamp if present."""
+        if not self.edited_ts and not self.original_ts:
+            if self.thread and msg.get('message'):
+                return lookup(msg, ('message', 'ts'))
+            return lookup(msg, ('ts',))
+        elif self.original:
+            return self.original_ts
+        return self.edited_ts
 
-    @property
-    @lru_cache(maxsize=1)
-    def text(self):
-        """Cached Property: Message text body."""
-        try:
-            try:
-                text = self.raw_data['text']
-                if text == '':
-                    text = '[NO TEXT]'
-            except KeyError:
-                try:
-                    text = self.raw_data['original']['text']
-                except KeyError:
-                    try:
-                        text = self.raw_data['message']['text']
-                    except KeyError:
-                        raise
-        except KeyError:
+    def parse_text(self, msg):
+        """Return message text body with files, attachments, and mentions formatted."""
+        text = lookup(msg, ('text',), ('original', 'text'), ('message', 'text'), default='[NO TEXT]')
+        if 'text' in msg and text == '':
             text = '[NO TEXT]'
 
-        if self.raw_data.get('files') or self.raw_data.get('original', {}).get('files'):
-            text = self.parse_msg_files(text)
+        if msg.get('files') or msg.get('original', {}).get('files'):
+            text = self.parse_msg_files(msg, text)
 
-        if self.raw_data.get('attachments'):
-            text = self.parse_msg_attachments(text)
+        if msg.get('attachments'):
+            text = self.parse_msg_attachments(msg, text)
 
         text = self.format_user_mentions(text)
-        if self.raw_data.get('reactions') and self.convo_obj.date_obj.export.input_email:
-            text = self.reactions_added(text)
-
         return text
 
-    def parse_msg_files(self, text):
+    def append_user_to_convo(self):
+        """Append user to convo participants if not already present. A participant with the sender's ID
+        but no full name, the sender's username under another ID, or the sender's ID as its bot ID is
+        replaced, earliest first.
+        """
+        participants = self.convo_obj.participants
+        sender_id = self.find_sender_id()
+        matches = [participants.first('user_id', sender_id, lambda user: not user.full_name),
+                   participants.first('user_name', self.sender_user_name, lambda user: user.user_id != sender_id)]
+        if sender_id:
+            matches.append(participants.first('bot_id', sender_id, lambda user: user.user_id != sender_id))
+        matches = [seq for seq in matches if seq is not None]
+        if matches:
+            participants.remove(min(matches))
+        if not participants.has('bot_id', sender_id) and not participants.has('user_id', sender_id):
+            user = User(self.convo_obj.date_obj.export.user_directory,
+                        user_id=sender_id,
+                        username=self.find_sender_full_name(sender_id))
+            participants.add(user)
+
+    def resolve_sender(self):
+        """Resolve sender fields against the final conversation participants."""
+        participants = self.convo_obj.participants
+        self.sender_id = self.find_sender_id()
+        self.sender_full_name = self.find_sender_full_name(self.sender_id)
+        seq = participants.first('user_id', self.sender_id)
+        self.sender_email = participants[seq].email if seq is not None else None
+        matches = [seq for seq in (participants.first('user_id', self.sender_id),
+                                   participants.first('full_name', self.sender_full_name),
+                                   participants.first('user_name', self.sender_user_name))
+                   if seq is not None]
+        self.sender_status = participants[min(matches)].status if matches else None
+
+    def find_sender_id(self):
+        """Return sender ID. ID of participant with matching username, else ID from raw message."""
+        if self.sender_user_name:
+            seq = self.convo_obj.participants.first('user_name', self.sender_user_name)
+            if seq is not None:
+                return self.convo_obj.participants[seq].user_id or self.raw_sender_id
+        return self.raw_sender_id
+
+    def find_sender_full_name(self, sender_id):
+        """Return sender full name. Name of matching participant, else name from raw message.
+        A posted username is followed through each later participant with that username.
+        """
+        participants = self.convo_obj.participants
+        seq = participants.first('user_id', sender_id, lambda user: user.full_name)
+        if seq is not None:
+            return participants[seq].full_name
+        if self.profile_full_name is not MISSING:
+            return self.profile_full_name
+        if self.posted_user_name is not MISSING:
+            name = self.posted_user_name
+            seq = participants.first('user_name', name)
+            while seq is not None:
+                name = participants[seq].full_name
+                seq = participants.first('user_name', name, after=seq)
+            return name
+        return None
+
+    def parse_msg_files(self, msg, text):
         """Parse message files if present & append to message text body."""
-        try:
-            try:
-                file = self.raw_data['files'][0]['name']
-            except KeyError:
-                try:
-                    file = self.raw_data['files'][0]['title']
-                except KeyError:
-                    try:
-                        file = self.raw_data['files'][0]['id']
-                    except KeyError:
-                        try:
-                            file = self.raw_data['original']['files'][0]['name']
-                        except KeyError:
-                            try:
-                                file = self.raw_data['message']['files'][0]['name']
-                            except KeyError:
-                                raise
-
-        except KeyError:
+        file = lookup(msg, ('files', 0, 'name'), ('files', 0, 'title'), ('files', 0, 'id'),
+                      ('original', 'files', 0, 'name'), ('message', 'files', 0, 'name'), default=MISSING)
+        if file is MISSING:
             updated_text = f"{text}<br/> » [FILE ATTACHED]"
         else:
             updated_text = f"{text}<br/> » [FILE ATTACHED]-[{file}]"
 
-        try:
-            id = self.raw_data['files'][0]['user']
-            user = User(self.convo_obj.date_obj.export.users_json, user_id=id)
-            updated_text = f"{text}<br/> » [FILE ATTACHED]-[{file}]-[File originally posted by @{user.full_name}]"
-        except KeyError:
-            pass
+        id = lookup(msg, ('files', 0, 'user'))
+        if id and file is not MISSING:
+            name = self.convo_obj.date_obj.export.user_directory.full_name(id)
+            updated_text = f"{text}<br/> » [FILE ATTACHED]-[{file}]-[File originally posted by @{name}]"
 
         return updated_text
 
-    def parse_msg_attachments(self, text):
+    @staticmethod
+    def parse_msg_attachments(msg, text):
         """Parse message attachments if present & append to message text body."""
-        try:
-            try:
-                file = self.raw_data['attachments'][0]['fallback']
-            except KeyError:
-                try:
-                    file = self.raw_data['attachments'][0]['image_url']
-                except KeyError:
-                    raise
-        except KeyError:
+        file = lookup(msg, ('attachments', 0, 'fallback'), ('attachments', 0, 'image_url'), default=MISSING)
+        if file is MISSING:
             updated_text = f"{text}<br/> » [FILE ATTACHED]"
         else:
             updated_text = f"{text}<br/> » [FILE ATTACHED]-[{file}]"
 
         return updated_text
 
-    @property
-    @lru_cache(maxsize=1)
-    def ts(self):
-        """Cached Property: Message timestamp."""
-        if not self.edited_ts and not self.original_ts:
-            if not self.thread:
-                try:
-                    ts = self.raw_data['ts']
-                except KeyError:
-                    pass
-            else:
-                try:
-                    if self.raw_data.get('message'):
-                        ts = self.raw_data['message']['ts']
-                    else:
-                        ts = self.raw_data['ts']
-                except KeyError:
-                    pass
-        elif self.original:
-            ts = self.original_ts
-        elif self.edited:
-            ts = self.edited_ts
-        return ts
-
-    @property
-    @lru_cache(maxsize=1)
-    def date_time_obj(self):
-        """Cached Property: Date/time object from message."""
-        ts = float(self.ts)
-        date_time_utc = datetime.fromtimestamp(ts, tz=timezone.utc)
-        return date_time_utc
-
-    @property
-    @lru_cache(maxsize=1)
-    def date(self):
-        """Cached Property: Formatted date."""
-        date = self.date_time_obj.astimezone().strftime('%Y-%m-%d')
-        return date
-
-    @property
-    @lru_cache(maxsize=1)
-    def time(self):
-        """Cached Property: Formatted time."""
-        time = self.date_time_obj.astimezone().strftime('%H:%M:%S')
-        return time
-
-    @property
-    @lru_cache(maxsize=1)
-    def tz(self):
-        """Cached Property: Timezone."""
-        tz = self.date_time_obj.astimezone().tzinfo
-        return tz
-
-    @property
-    @lru_cache(maxsize=1)
-    def thread(self):
-        """Cached Property: Thread status."""
-        status = (True if self.raw_data.get('reply_count')
-                  else True if self.raw_data.get('thread_ts')
-                  else True if self.raw_data.get('message', {}).get('thread_ts')
-                  else False)
-        return status
-
-    @property
-    @lru_cache(maxsize=1)
-    def thread_ts(self):
-        """Cached Property: Thread timestamp."""
-        try:
-            ts = self.raw_data['thread_ts']
-        except KeyError:
-            try:
-                ts = self.raw_data['message']['thread_ts']
-            except KeyError:
-                ts = None
-        return ts
-
-    @property
-    @lru_cache(maxsize=1)
-    def thread_parent(self):
-        """Cached Property: Thread parent status."""
-        return True if self.ts == self.thread_ts else False
-
-    @property
-    @lru_cache(maxsize=1)
-    def thread_child(self):
-        """Cached Property: Thread child status."""
-        return True if self.thread and self.ts != self.thread_ts else False
-
-    @property
-    @lru_cache(maxsize=1)
-    def thread_id(self):
-        """Cached Property: Thread ID."""
-        if self.thread_child:
-            try:
-                id = self.raw_data['parent_user_id']
-            except KeyError:
-                try:
-                    id = self.raw_data['message']['parent_user_id']
-                except KeyError:
-                    try:
-                        id = self.raw_data['original']['parent_user_id']
-                    except KeyError:
-                        try:
-                            id = self.raw_data['root']['user']
-                        except KeyError:
-                            id = None
-        else:
-            id = None
-        return id
-
-    @property
-    @lru_cache(maxsize=1)
-    def original(self):
-        """Cached Property: Original status."""
-        return True if self.raw_data.get('original') else False
-
-    @property
-    @lru_cache(maxsize=1)
-    def original_ts(self):
-        """Cached Property: Original timestamp."""
-        try:
-            ts = self.raw_data['original']['ts']
-        except KeyError:
-            ts = None
-        return ts
-
-    @property
-    @lru_cache(maxsize=1)
-    def edited(self):
-        """Cached Property: Edited status."""
-        status = (True if self.raw_data.get('edited')
-                  else True if self.raw_data.get('message', {}).get('edited')
-                  else False)
-        return status
-
-    @property
-    @lru_cache(maxsize=1)
-    def edited_ts(self):
-        """Cached Property: Edited timestamp."""
-        try:
-            ts = self.raw_data['edited']['ts']
-        except KeyError:
-            try:
-                ts = self.raw_data['message']['edited']['ts']
-            except KeyError:
-                ts = None
-        return ts
-
-    @property
-    @lru_cache(maxsize=1)
-    def edited_by(self):
-        """Cached Property: Edited by."""
-        try:
-            user = self.raw_data['edited']['user']
-        except KeyError:
-            try:
-                user = self.raw_data['edited_by']
-            except KeyError:
-                user = None
-        return user
-
-    @property
-    @lru_cache(maxsize=1)
-    def deleted(self):
-        """Cached Property: Deleted status."""
-        return True if self.raw_data.get('deleted_by') else True if self.raw_data.get('deleted_ts') else None
-
-    @property
-    @lru_cache(maxsize=1)
-    def deleted_ts(self):
-        """Cached Property: Deleted timestamp."""
-        try:
-            ts = self.raw_data['deleted_ts']
-        except KeyError:
-            ts = None
-        return ts
-
-    @property
-    @lru_cache(maxsize=1)
-    def deleted_by(self):
-        """Cached Property: Deleted by."""
-        try:
-            user = self.raw_data['deleted_by']
-        except KeyError:
-            user = None
-        return user
-
-    def reactions_added(self, text):
-        """Format reactions added by specified user and append to message text body."""
-        updated_text = text
-        user = self.convo_obj.date_obj.export.target_user
-        users = [id for reaction in self.raw_data['reactions']
-                 for id in reaction['users']
-                 if id == user.user_id]
-        if user.user_id in users:
-            updated_text = f"{text}<br/> » [Emoji Reaction added by @{user.full_name}]"
-        return updated_text
+    def reactions_added(self, user):
+        """Return message text body with reaction added by specified user appended, if user reacted.
+        Kept out of text so messages can be shared by exports of different users.
+        """
+        if user and user.user_id in self.reactors:
+            return f"{self.text}<br/> » [Emoji Reaction added by @{user.full_name}]"
+        return self.text
 
     def format_user_mentions(self, text):
-        """Format user, group, and email mentions."""
-        words = text.split()
-        for index, word in enumerate(words):
-            if word.startswith('<@'):
-                parsed_id = word.split('@')[1].split('>')[0]
-                user = User(self.convo_obj.date_obj.export.users_json, user_id=parsed_id)
-                if user.full_name:
-                    words[index] = f'@{user.full_name}'
-                else:
-                    continue
-            elif word.startswith('<http'):
-                parsed_word = word.split('<')[1].split('>')[0]
-                words[index] = parsed_word
-            elif word.startswith('<mailto:'):
-                parsed_word = word.split('|')[1].split('>')[0]
-                words[index] = parsed_word
-            elif word.startswith('<!subteam'):
-                parsed_word = word.split('|')[1].split('>')[0]
-                words[index] = parsed_word
-            elif word.startswith('<!'):
-                parsed_word = f"@{word.split('!')[1].split('>')[0]}"
-                words[index] = parsed_word
-        new_str = ' '
-        text = new_str.join(words)
-        return text
-
-
-
+        """Format user, group, and email mentions & links in a single pass over Slack markup tokens.
+        Tokens are matched anywhere in text, so whitespace & surrounding punctuation are kept.
+        """
+        return SLACK_MARKUP.sub(self.format_markup, text)
+
+    def format_markup(self, match):
+        """Return display text of a Slack markup token. Unknown users are left as is."""
+        kind, body = match.groups()
+        if kind == '@':
+            name = self.convo_obj.date_obj.export.user_directory.full_name(body.split('|')[0])
+            return f'@{name}' if name else match.group(0)
+        elif kind == 'mailto:' or kind == '!subteam^':
+            return body.split('|')[-1]
+        elif kind == '!':
+            return f"@{body.split('|')[0]}"
+        return f'{kind}{body}'
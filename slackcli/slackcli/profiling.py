@@ -0,0 +1,132 @@
+import cProfile
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Profiler:
+    """Class representing the stage timers & counters of an export, off unless started.
+    Stage times are exclusive: time spent in a stage nested inside another, such as decoding
+    while a Date is normalized, is only counted for the inner stage. Each thread nests its own
+    stages & stage CPU time is the thread's own, so stages of batch renderer threads are timed
+    apart from the parsing in the main thread. When off, stages & counters do nothing, so
+    instrumented code runs at full speed.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self.counters = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.started = None
+        self.cprofile = None
+
+    @property
+    def stack(self):
+        """Property: [wall, CPU] time of stages nested in each open stage of the current thread."""
+        try:
+            return self.local.stack
+        except AttributeError:
+            self.local.stack = []
+            return self.local.stack
+
+    def start(self, cprofile=False):
+        """Reset & turn on stage timers & counters. Also turn on cProfile if set."""
+        self.stages = {}
+        self.counters = {}
+        self.local = threading.local()
+        self.enabled = True
+        self.started = (time.perf_counter(), time.process_time())
+        self.cprofile = cProfile.Profile() if cprofile else None
+        if self.cprofile:
+            self.cprofile.enable()
+
+    def stop(self, report=None, cprofile=None):
+        """Turn off profiling. Write JSON report & cProfile dump to given paths."""
+        self.enabled = False
+        if self.cprofile:
+            self.cprofile.disable()
+            if cprofile:
+                self.cprofile.dump_stats(cprofile)
+        if report:
+            with open(report, 'w') as report_file:
+                json.dump(self.report(), report_file, indent=4)
+
+    @contextmanager
+    def stage(self, name):
+        """Time block as a stage, less the time of stages nested in it."""
+        if not self.enabled:
+            yield
+            return
+        stack = self.stack
+        wall, cpu = time.perf_counter(), time.thread_time()
+        stack.append([0.0, 0.0])
+        try:
+            yield
+        finally:
+            nested_wall, nested_cpu = stack.pop()
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            with self.lock:
+                record = self.stages.setdefault(name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+                record['calls'] += 1
+                record['wall'] += wall - nested_wall
+                record['cpu'] += cpu - nested_cpu
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+
+    def timed(self, name):
+        """Decorator: time each call of function as a stage."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stream(self, name, iterable):
+        """Return iterable with the time to produce each item timed as a stage, if profiling."""
+        if not self.enabled:
+            return iterable
+        return self.timed_items(name, iter(iterable))
+
+    def timed_items(self, name, iterator):
+        """Generate each item of iterator, timing each step as a stage."""
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, amount=1):
+        """Add amount to counter, if profiling."""
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def rate(self, hits, misses):
+        """Return share of hits among hits & misses counters. None if neither was counted."""
+        total = self.counters.get(hits, 0) + self.counters.get(misses, 0)
+        return round(self.counters.get(hits, 0) / total, 4) if total else None
+
+    def report(self):
+        """Return dict of total & per stage wall/CPU seconds, counters & cache hit rates."""
+        wall, cpu = self.started
+        with self.lock:
+            return {'total': {'wall': round(time.perf_counter() - wall, 4),
+                              'cpu': round(time.process_time() - cpu, 4)},
+                    'stages': {name: {'calls': record['calls'],
+                                      'wall': round(record['wall'], 4),
+                                      'cpu': round(record['cpu'], 4)}
+                               for name, record in sorted(self.stages.items(),
+                                                          key=lambda item: -item[1]['wall'])},
+                    'counters': dict(sorted(self.counters.items())),
+                    'cache_hit_rates': {'user_names': self.rate('user_cache_hits', 'user_cache_misses'),
+                                        'timestamps': self.rate('clock_cache_hits', 'clock_cache_misses')}}
+
+PROFILE = Profiler()
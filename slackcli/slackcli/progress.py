@@ -0,0 +1,56 @@
+import json
+import os
+
+import click
+
+from slackcli.index import archive_digest
+
+
+class Progress:
+    """Class representing the progress manifest of an export, saved in the output directory.
+    Records each finished output file with the convo-type, channels & dates it holds and its hash,
+    so a resumed export only renders what is left.
+    """
+    def __init__(self, options, resume=False, path='progress.json'):
+        self.options = options
+        self.path = path
+        self.units = {}
+        if resume:
+            self.load()
+        self.save()
+
+    def load(self):
+        """Load manifest of an interrupted export with the same options, if present."""
+        try:
+            with open(self.path) as progress_file:
+                data = json.load(progress_file)
+        except (OSError, ValueError):
+            return
+        if data.get('options') != self.options:
+            print(f'\r{70 * " "}', end='\r', flush=True)
+            raise click.BadParameter(f'{self.path} was written by an export with different options. '
+                                     f'Run again without --resume to start over.')
+        self.units = data['units']
+
+    def save(self):
+        """Write manifest to a temporary file & move it into place, so it is never left half written."""
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as progress_file:
+            json.dump({'options': self.options, 'units': self.units}, progress_file, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def done(self, name):
+        """Return True if output unit is finished & its file is unchanged."""
+        unit = self.units.get(name)
+        if not unit or not os.path.exists(unit['file']):
+            return False
+        return archive_digest(unit['file']) == unit['sha256']
+
+    def complete(self, name, output, convo_type, files):
+        """Record finished output unit with the channels & dates of its files, then save manifest."""
+        self.units[name] = {'file': output,
+                            'convo_type': convo_type,
+                            'channels': sorted({file[0].split('/')[0] for file in files}),
+                            'dates': sorted({file[1] for file in files}),
+                            'sha256': archive_digest(output)}
+        self.save()
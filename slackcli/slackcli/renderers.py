@@ -0,0 +1,82 @@
+import csv
+import html
+import json
+
+from slackcli.export import Renderer, Pdf, CONVO_TITLES
+
+
+class JsonLines(Renderer):
+    """JSON Lines Class. Writes one JSON object per message."""
+    extension = 'jsonl'
+
+    def render_file(self, name, convo_type, days):
+        """Write JSON line for each message in days of a convo-type to file name."""
+        with open(f'{name}.{self.extension}', 'w') as output:
+            for record in self.records(convo_type, days):
+                output.write(json.dumps(record))
+                output.write('\n')
+
+
+class Csv(Renderer):
+    """CSV Class. Writes one row per message."""
+    extension = 'csv'
+    fields = ('convo_type', 'date', 'conversation', 'participants', 'ts', 'time', 'tz', 'sender_id',
+              'sender_name', 'sender_email', 'sender_username', 'sender_status', 'thread_ts',
+              'thread_child', 'edited', 'deleted', 'original', 'text')
+
+    def render_file(self, name, convo_type, days):
+        """Write CSV row for each message in days of a convo-type to file name."""
+        with open(f'{name}.{self.extension}', 'w', newline='') as output:
+            writer = csv.DictWriter(output, fieldnames=self.fields)
+            writer.writeheader()
+            for record in self.records(convo_type, days):
+                record['participants'] = '; '.join(name or '' for name in record['participants'])
+                writer.writerow(record)
+
+
+class Html(Renderer):
+    """HTML Class. Writes a static HTML page, one section per conversation day."""
+    extension = 'html'
+    style = ('body{font-family:Helvetica,Arial,sans-serif;font-size:13px;margin:2em}'
+             'h1{font-size:22px}h2{font-size:15px;margin:1.5em 0 .3em}'
+             '.participants{color:#555;margin-bottom:.8em}.msg{margin:0 0 .8em}'
+             '.reply{margin-left:2em}.info{font-size:11px;font-style:italic;font-weight:bold}'
+             '.text{white-space:pre-wrap}')
+
+    def render_file(self, name, convo_type, days):
+        """Write HTML page of days of a convo-type to file name, one message at a time."""
+        with open(f'{name}.{self.extension}', 'w') as output:
+            output.write(f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+                         f'<title>{html.escape(name)}</title>\n<style>{self.style}</style>\n</head>\n<body>\n')
+            date = conversation = None
+            for record in self.records(convo_type, days):
+                if record['date'] != date:
+                    date = record['date']
+                    output.write(f'<h1>{CONVO_TITLES[convo_type]}, {html.escape(date)}</h1>\n')
+                    conversation = None
+                if record['conversation'] != conversation:
+                    conversation = record['conversation']
+                    names = ', '.join(html.escape(name or '') for name in record['participants'])
+                    output.write(f'<h2>{html.escape(conversation)}</h2>\n'
+                                 f'<div class="participants">Participants: {names}</div>\n')
+                output.write(self.message(record))
+            output.write('</body>\n</html>\n')
+
+    @staticmethod
+    def message(record):
+        """Return HTML block of a message record with sender, time & status flags."""
+        info = f'{record["sender_name"]} ({record["sender_email"] or record["sender_id"]}), {record["time"]}'
+        flags = [flag for flag in ('edited', 'deleted', 'original') if record[flag]]
+        if flags:
+            info = f'{info} [{", ".join(flags).upper()}]'
+        css = 'msg reply' if record['thread_child'] else 'msg'
+        return (f'<div class="{css}"><div class="info">{html.escape(info)}</div>'
+                f'<div class="text">{html.escape(record["text"])}</div></div>\n')
+
+
+RENDERERS = {
+    'pdf': Pdf,
+    'jsonl': JsonLines,
+    'csv': Csv,
+    'html': Html
+}
@@ -0,0 +1,131 @@
+import asyncio
+import random
+import threading
+import time
+
+from aiohttp import ClientError
+from slack.errors import SlackApiError
+
+
+TIERS = {1: 1, 2: 20, 3: 50, 4: 100}
+METHOD_TIERS = {
+    'conversations.list': 2,
+    'users.list': 2,
+    'conversations.info': 3,
+    'users.lookupByEmail': 3,
+    'conversations.members': 4,
+    'users.info': 4,
+    'users.profile.get': 4
+}
+
+
+class TokenBucket:
+    """Class representing the rate limit of a Slack API method. Filled at the calls per minute of the
+    method's tier & holds up to a minute of calls, as Slack limits calls per minute, so bursts are
+    not delayed. Thread safe.
+    """
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, waiting until one is free. Return seconds waited."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = max(-self.tokens / self.rate, self.paused_until - now, 0.0)
+        time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Hold all calls for seconds & drop saved up tokens, as Slack asked to slow down."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class Scheduler:
+    """Class representing the scheduler of Slack API calls. Each method is limited to the rate of
+    its tier. Calls rate limited by Slack (HTTP 429) are retried after the Retry-After period & calls
+    failing on a server or network error are retried with exponential backoff & jitter.
+    Throughput & throttling of each method are kept in stats.
+    """
+    MAX_RETRIES = 5
+    BACKOFF = 1.0
+    MAX_BACKOFF = 60.0
+
+    def __init__(self):
+        self.buckets = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+    @staticmethod
+    def api_method(method):
+        """Return Slack API method name of WebClient method. ie. users_lookupByEmail > users.lookupByEmail"""
+        return method.replace('_', '.')
+
+    def bucket(self, name):
+        """Return token bucket of API method, created at its tier's rate when first called."""
+        with self.lock:
+            if name not in self.buckets:
+                self.buckets[name] = TokenBucket(TIERS[METHOD_TIERS.get(name, 3)])
+                self.counts[name] = {'calls': 0, 'throttled': 0, 'retries': 0, 'waited': 0.0}
+            return self.buckets[name]
+
+    def record(self, name, key, amount=1):
+        """Add amount to stat of API method."""
+        with self.lock:
+            self.counts[name][key] += amount
+
+    def call(self, client, method, **kwargs):
+        """Call WebClient method once its rate limit allows. Return response.
+        Raises SlackApiError for errors that are not retried or once retries run out.
+        """
+        name = self.api_method(method)
+        bucket = self.bucket(name)
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.record(name, 'waited', bucket.acquire())
+            self.record(name, 'calls')
+            try:
+                return getattr(client, method)(**kwargs)
+            except SlackApiError as error:
+                status = getattr(error.response, 'status_code', None) or 0
+                if attempt == self.MAX_RETRIES or status != 429 and status < 500:
+                    raise
+                if status == 429:
+                    self.record(name, 'throttled')
+                    retry_after = error.response.headers.get('Retry-After')
+                    wait = float(retry_after) if retry_after else self.backoff(attempt)
+                    bucket.pause(wait + random.uniform(0, 1))
+                else:
+                    self.sleep(name, self.backoff(attempt))
+            except (ClientError, asyncio.TimeoutError):
+                if attempt == self.MAX_RETRIES:
+                    raise
+                self.sleep(name, self.backoff(attempt))
+            self.record(name, 'retries')
+
+    def backoff(self, attempt):
+        """Return exponential backoff of attempt with full jitter."""
+        return random.uniform(0, min(self.MAX_BACKOFF, self.BACKOFF * 2 ** attempt))
+
+    def sleep(self, name, seconds):
+        """Wait seconds before retrying API method, counted as waited."""
+        time.sleep(seconds)
+        self.record(name, 'waited', seconds)
+
+    def stats(self):
+        """Return dict of calls, calls per second, throttled calls, retries & seconds waited per API method."""
+        elapsed = time.monotonic() - self.started
+        with self.lock:
+            return {name: {**counts,
+                           'waited': round(counts['waited'], 2),
+                           'per_second': round(counts['calls'] / elapsed, 2) if elapsed else None}
+                    for name, counts in self.counts.items()}
@@ -1,8 +1,15 @@
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import click
 from slack import WebClient
 from slack.errors import SlackApiError
 
+from slackcli.cache import DirectoryCache
+from slackcli.scheduler import Scheduler
+
 
 def token():
     try:
@@ -15,18 +22,53 @@ def token():
 
 
 class SlackAPI:
-    """Class representing the Slack API."""
-    def __init__(self, channel=None, user=None):
-        self.slack = WebClient(token=token())
+    """Class representing the Slack API. All calls go through a rate limit aware Scheduler.
+    Users & channels are read from the DirectoryCache when fresh, unless refresh is set.
+    """
+    MAX_WORKERS = 8
+    DIRECTORY_MEMBERS = 100
+
+    def __init__(self, channel=None, user=None, refresh=False):
+        api_token = token()
+        self.slack = WebClient(token=api_token)
         self.channel = channel
         self.user = user
+        self.local = threading.local()
+        self.scheduler = Scheduler()
+        self.cache = DirectoryCache(api_token, ttl=0 if refresh else DirectoryCache.TTL)
+
+    @property
+    def client(self):
+        """Property: WebClient of the current thread. A WebClient runs each call to completion on its
+        thread's event loop, so threads making calls at the same time each need their own.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.slack
+        if not hasattr(self.local, 'client'):
+            self.local.client = WebClient(token=token())
+        return self.local.client
+
+    def call(self, method, **kwargs):
+        """Call WebClient method of current thread through the scheduler. Return response."""
+        return self.scheduler.call(self.client, method, **kwargs)
+
+    def paginate(self, method, key, **kwargs):
+        """Generate each item in list key of a cursor paginated API method, one page at a time."""
+        r = self.call(method, **kwargs)
+        yield from r[key]
+        while r.get('response_metadata', {}).get('next_cursor'):
+            r = self.call(method, cursor=r['response_metadata']['next_cursor'], **kwargs)
+            yield from r[key]
 
     def lookup_user_by_email(self):
         """Lookup user by email & parse relevant info."""
+        user = self.cache.user(self.user)
+        if user:
+            return self.user_info(user)
         try:
-            r = self.slack.users_lookupByEmail(email=self.user)
+            r = self.call('users_lookupByEmail', email=self.user)
         except SlackApiError as e:
-            print(f'\r{70 * " "}', end='\r', flush=True)
+            print(f'\r{70 * " "}', end='\r', flush=True, file=sys.stderr)
             raise click.BadParameter(f'User {self.user} could not be found.')
 
         info = self.parse_user_info(r)
@@ -34,94 +76,169 @@ class SlackAPI:
 
     def lookup_user_by_id(self):
         """Lookup user by ID & parse relevant info."""
+        user = self.cache.user(self.user)
+        if user:
+            return self.user_info(user)
         try:
-            r = self.slack.users_profile_get(user=self.user)
+            r = self.call('users_info', user=self.user)
         except SlackApiError as e:
-            print(f'\r{70 * " "}', end='\r', flush=True)
+            print(f'\r{70 * " "}', end='\r', flush=True, file=sys.stderr)
             raise click.BadParameter(f'User {self.user} could not be found.')
 
         info = self.parse_user_info(r)
         return info
 
     def parse_user_info(self, data):
-        """Parse & return dict of relevant user info."""
-        if not data.get('user'):
-            email = data['profile']['email']
-            data = self.slack.users_lookupByEmail(email=email)
+        """Parse & return dict of relevant user info. User is saved to the cache."""
+        self.cache.save_users([data['user']])
+        return self.user_info(data['user'])
+
+    def bulk_user_info(self, users):
+        """Generate (email or ID, user info) of each user in the order given, info None for users that
+        could not be found. Users are read from the cache when fresh. If many are not, they are resolved
+        against a snapshot of the users list. The rest are looked up with one call each by at most
+        MAX_WORKERS threads, & info is generated as soon as each user in turn is found. Users looked up are
+        saved to the cache once done.
+        """
+        keys = list(users)
+        found = {key: self.cache.user(key) for key in dict.fromkeys(keys)}
+        if sum(not user for user in found.values()) >= self.DIRECTORY_MEMBERS:
+            snapshot = {}
+            for user in self.users_snapshot():
+                snapshot[user['id']] = user
+                if user.get('profile', {}).get('email'):
+                    snapshot[user['profile']['email'].lower()] = user
+            found.update([(key, snapshot.get(key.lower() if '@' in key else key))
+                          for key, user in found.items() if not user])
+        missing = [key for key, user in found.items() if not user]
+        pending = set(missing)
+        executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        try:
+            lookups = executor.map(self.fetch_user, missing)
+            for key in keys:
+                if key in pending:
+                    pending.remove(key)
+                    found[key] = next(lookups)
+                yield key, self.user_info(found[key]) if found[key] else None
+        finally:
+            executor.shutdown(cancel_futures=True)
+            self.cache.save_users([found[key] for key in missing if key not in pending and found[key]])
 
+    def fetch_user(self, key):
+        """Lookup user by email or ID with one call. Return user, None if not found."""
+        try:
+            if '@' in key:
+                return self.call('users_lookupByEmail', email=key)['user']
+            return self.call('users_info', user=key)['user']
+        except SlackApiError:
+            return None
+
+    @staticmethod
+    def user_info(user):
+        """Return dict of relevant user info from API or cached user."""
         info = {
-            'Name': data['user']['real_name'],
-            'ID': data['user']['id'],
-            'Admin': data['user']['is_admin'],
-            'Owner': data['user']['is_owner']
+            'Name': user['real_name'],
+            'ID': user['id'],
+            'Admin': user['is_admin'],
+            'Owner': user['is_owner']
         }
         return info
 
     def lookup_channels(self):
-        """Lookup & parse relevant channel."""
-        r = self.slack.conversations_list(types='public_channel, private_channel',
-                                          limit=1000, exclude_archived='true')
-        while True:
-            rel_chan = self.parse_relevant_channel(r['channels'])
-            next_cursor = (r['response_metadata']['next_cursor']
-                           if r['response_metadata'].get('next_cursor')
-                           else False)
-
-            if not next_cursor or rel_chan:
-                break
-            try:
-                r = self.slack.conversations_list(cursor=next_cursor,
-                                                  limit=1000, types='public_channel, private_channel',
-                                                  exclude_archived='true')
-
-            except SlackApiError as e:
-                print(e.args)
-
-        return rel_chan
-
-    def parse_relevant_channel(self, channels):
-        """Parse relevant channel ID from list of channels."""
-        data = None
-        for chan in channels:
-            if chan['name'] == self.channel:
-                data = chan['id']
-                break
-        return data
+        """Lookup & parse relevant channel. Pages of channels are only requested until it is found."""
+        return self.sweep_channels([self.channel]).get(self.channel)
+
+    def sweep_channels(self, keys):
+        """Return dict of channel name or ID to channel ID for each of keys found in one sweep of the
+        channel listings. Pages of channels are only requested until all are found. Channels listed are
+        saved to the cache.
+        """
+        wanted = set(keys)
+        found = {}
+        channels = self.paginate('conversations_list', 'channels', types='public_channel, private_channel',
+                                 limit=1000, exclude_archived='true')
+        channels = self.cache.saving(self.cache.save_channels, channels)
+        try:
+            for chan in channels:
+                for key in (chan['name'], chan['id']):
+                    if key in wanted:
+                        found.setdefault(key, chan['id'])
+                if len(found) == len(wanted):
+                    break
+        except SlackApiError as e:
+            print(f'\r{70 * " "}', end='\r', flush=True, file=sys.stderr)
+            raise click.ClickException(f'Channels could not be listed: {e.response.get("error")}')
+        finally:
+            channels.close()
+        return found
 
     def channel_data(self):
-        """Lookup relevant channel and return channel data."""
+        """Lookup relevant channel and return channel data. A channel name is resolved to its ID from
+        the cache when fresh, else by listing channels. Channel is saved to the cache.
+        """
+        cached = self.cache.channel(self.channel)
         try:
-            data = self.slack.conversations_info(channel=self.channel)
-            if 'error' in data:
+            data = self.call('conversations_info', channel=cached['id'] if cached else self.channel)
+            if 'error' in data or self.channel not in (data['channel']['id'], data['channel']['name']):
                 raise Exception
 
         except Exception:
             id = self.lookup_channels()
             if not id:
-                print(f'\r{70 * " "}', end='\r', flush=True)
+                print(f'\r{70 * " "}', end='\r', flush=True, file=sys.stderr)
                 raise click.BadParameter(f'Channel {self.channel} could not be located.')
-            data = self.slack.conversations_info(channel=id)
+            data = self.call('conversations_info', channel=id)
+        self.cache.save_channels([data['channel']])
         return data
 
     def parse_channel_members(self, data):
         """Parse return all members/member data (list) of relevant channel."""
-        id = data['channel']['id']
-        r = self.slack.conversations_members(channel=id, limit=1000)
-        members = r['members']
-        while True:
-            next_cursor = (r['response_metadata']['next_cursor']
-                           if r['response_metadata'].get('next_cursor')
-                           else False)
-            if not next_cursor:
-                break
-            r = self.slack.conversations_members(channel=id, limit=1000, cursor=next_cursor)
-            members += r['members']
-        members_list = []
-        for member in members:
-            r = self.slack.users_profile_get(user=member)
-            members_list.append((r['profile']['real_name'], r['profile']['email'] if r['profile'].get('email') else None))
-
-        return members_list
+        members = self.channel_members(data['channel']['id'])
+        directory = self.resolve_members(members)
+        return [directory[member] for member in members]
+
+    def channel_members(self, id):
+        """Return list of member IDs of channel."""
+        return list(self.paginate('conversations_members', 'members', channel=id, limit=1000))
+
+    def resolve_members(self, members):
+        """Return dict of user ID to member data of members.
+        Members are read from the cache when fresh. If many are not, they are resolved against a snapshot
+        of the users list, which takes one call per 1000 users. Others, & members missing from the
+        snapshot, are looked up concurrently.
+        """
+        directory = {user_id: self.member_data(user['profile'])
+                     for user_id, user in self.cache.users(members).items()}
+        if len(set(members) - directory.keys()) >= self.DIRECTORY_MEMBERS:
+            directory.update(self.users_directory())
+        missing = list(dict.fromkeys(member for member in members if member not in directory))
+        directory.update(self.member_profiles(missing))
+        return directory
+
+    def users_directory(self):
+        """Return dict of user ID to member data of every user in the workspace. Users are saved to the cache."""
+        return {user['id']: self.member_data(user['profile']) for user in self.users_snapshot()}
+
+    def users_snapshot(self):
+        """Return list of every user in the workspace, one call per 1000 users. Users are saved to the cache."""
+        return list(self.cache.saving(self.cache.save_users, self.paginate('users_list', 'members', limit=1000)))
+
+    def member_profiles(self, members):
+        """Return dict of user ID to member data of members, looked up by at most MAX_WORKERS threads."""
+        if not members:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(members))) as executor:
+            return dict(zip(members, executor.map(self.member_profile, members)))
+
+    def member_profile(self, member):
+        """Lookup profile of member & return member data."""
+        r = self.call('users_profile_get', user=member)
+        return self.member_data(r['profile'])
+
+    @staticmethod
+    def member_data(profile):
+        """Parse member data (full name, email) from user profile."""
+        return profile['real_name'], profile['email'] if profile.get('email') else None
 
     @staticmethod
     def parse_channel_info(data):
@@ -141,3 +258,60 @@ class SlackAPI:
         chan_info['# of Members'] = len(members)
         return {'info': chan_info,
                 'members': members}
+
+    def bulk_channel_info(self, channels):
+        """Collect & return list of complete channel info of each channel name or ID, in the order given.
+        None for channels that could not be located. Channel names are resolved from the cache when fresh &
+        the rest in one sweep of the channel listings. Channel info & members are fetched concurrently &
+        members of all channels are resolved together, so a user in many channels is looked up once.
+        """
+        keys = list(dict.fromkeys(channels))
+        ids = {}
+        for key in keys:
+            cached = self.cache.channel(key)
+            if cached:
+                ids[key] = cached['id']
+        fetched = self.fetch_channels(ids)
+        # Names cached for a channel since renamed, & channels not cached, are found by listing channels.
+        unresolved = [key for key in keys if not self.is_channel(key, fetched.get(key))]
+        ids = self.sweep_channels(unresolved) if unresolved else {}
+        # Archived channels are not listed, but may still be looked up by ID.
+        ids.update((key, key) for key in unresolved if key not in ids)
+        fetched.update(self.fetch_channels(ids))
+
+        found = [fetched[key] for key in keys if self.is_channel(key, fetched.get(key))]
+        self.cache.save_channels([data['channel'] for data, _ in found])
+        directory = self.resolve_members([member for _, members in found for member in members])
+        results = {}
+        for key in keys:
+            if not self.is_channel(key, fetched.get(key)):
+                results[key] = None
+                continue
+            data, members = fetched[key]
+            chan_info = self.parse_channel_info(data)
+            chan_info['# of Members'] = len(members)
+            results[key] = {'info': chan_info,
+                            'members': [directory[member] for member in members]}
+        return [results[key] for key in channels]
+
+    def fetch_channels(self, ids):
+        """Return dict of key to (channel info, member IDs) of each channel in dict of key to channel ID,
+        fetched by at most MAX_WORKERS threads. None for channels that could not be fetched.
+        """
+        if not ids:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(ids))) as executor:
+            return dict(zip(ids, executor.map(self.fetch_channel, ids.values())))
+
+    def fetch_channel(self, id):
+        """Fetch & return (channel info, member IDs) of channel. None if it could not be fetched."""
+        try:
+            data = self.call('conversations_info', channel=id)
+            return data, self.channel_members(data['channel']['id'])
+        except SlackApiError:
+            return None
+
+    @staticmethod
+    def is_channel(key, fetched):
+        """Return whether fetched channel is the one named or identified by key."""
+        return bool(fetched) and key in (fetched[0]['channel']['id'], fetched[0]['channel']['name'])
@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import zlib
+
+from slackcli.index import UserIndex
+from slackcli.profiling import PROFILE
+from slackcli.stream import iter_json_array
+
+
+SCHEMA = '''
+CREATE TABLE members (id INTEGER PRIMARY KEY, name TEXT UNIQUE, channel TEXT, date TEXT);
+CREATE TABLE documents (name TEXT PRIMARY KEY, data BLOB);
+CREATE TABLE messages (member INTEGER, position INTEGER, data BLOB, PRIMARY KEY (member, position)) WITHOUT ROWID;
+CREATE TABLE message_users (member INTEGER, user_id TEXT);
+CREATE INDEX members_channel_date ON members (channel, date);
+CREATE INDEX message_users_user ON message_users (user_id);
+'''
+
+
+def encode(data):
+    """Encode JSON data as compressed blob."""
+    return zlib.compress(json.dumps(data, separators=(',', ':')).encode())
+
+
+def decode(blob):
+    """Decode compressed blob to JSON data."""
+    data = zlib.decompress(blob)
+    PROFILE.count('bytes_decompressed', len(data))
+    return json.loads(data)
+
+
+class ExportStore:
+    """Class representing an SQLite store of a parsed export ZIP, saved next to the ZIP & keyed on its key.
+    Holds messages indexed by channel, date and the users appearing in them, so filtered
+    exports only read the rows they need instead of decompressing the whole ZIP.
+    """
+    def __init__(self, zip_path, key):
+        self.zip_path = zip_path
+        self.key = key
+        self.connection = None
+
+    @property
+    def path(self):
+        """Property: store file path next to the ZIP file."""
+        return f'{self.zip_path}.{self.key[:16]}.sqlite'
+
+    @property
+    def exists(self):
+        """Property: Store has been ingested for this archive."""
+        return os.path.exists(self.path)
+
+    def connect(self):
+        """Return connection to store, opening it on first use."""
+        if not self.connection:
+            self.connection = sqlite3.connect(self.path)
+        return self.connection
+
+    def ingest(self, zip_file):
+        """Decode each member of ZIP file once & write it to the store.
+        Store is written to a temporary file & moved into place once complete.
+        """
+        tmp_path = f'{self.path}.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        connection.executescript(SCHEMA)
+        for name in zip_file.namelist():
+            if not name.endswith('.json'):
+                continue
+            with zip_file.open(name) as json_file:
+                if '/' in name:
+                    self.ingest_messages(connection, name, iter_json_array(json_file))
+                else:
+                    self.ingest_document(connection, name, json.loads(json_file.read()))
+        connection.commit()
+        connection.close()
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def ingest_document(connection, name, data):
+        """Write top level JSON file of export."""
+        connection.execute('INSERT INTO members (name) VALUES (?)', (name,))
+        connection.execute('INSERT INTO documents VALUES (?, ?)', (name, encode(data)))
+
+    @classmethod
+    def ingest_messages(cls, connection, name, msgs):
+        """Write messages of a channel/day file as they are decoded & index the users appearing in it."""
+        channel = name.split('/')[0]
+        date = name.split('/')[1].split('.')[0]
+        member = connection.execute('INSERT INTO members (name, channel, date) VALUES (?, ?, ?)',
+                                    (name, channel, date)).lastrowid
+        user_ids = set()
+        connection.executemany('INSERT INTO messages VALUES (?, ?, ?)',
+                               cls.message_rows(member, msgs, user_ids))
+        connection.executemany('INSERT INTO message_users VALUES (?, ?)',
+                               ((member, user_id) for user_id in sorted(user_ids)))
+
+    @staticmethod
+    def message_rows(member, msgs, user_ids):
+        """Generate message table row for each message, adding the users in it to user_ids."""
+        for position, msg in enumerate(msgs):
+            UserIndex.user_ids(msg, user_ids)
+            yield member, position, encode(msg)
+
+    def members(self, channel=None):
+        """Return list of ZIP member names held in store. Only the day files of channel, if given."""
+        if channel is None:
+            rows = self.connect().execute('SELECT name FROM members ORDER BY id')
+        else:
+            rows = self.connect().execute('SELECT name FROM members WHERE channel = ? ORDER BY date', (channel,))
+        return [row[0] for row in rows]
+
+    def message_counts(self):
+        """Return dict of ZIP member name to number of messages in it, counted without decoding them."""
+        rows = self.connect().execute('SELECT members.name, COUNT(*) FROM members '
+                                      'JOIN messages ON messages.member = members.id GROUP BY members.id')
+        return dict(rows)
+
+    def iter_load(self, name):
+        """Generate each item of ZIP member. Messages are decoded one row at a time."""
+        connection = self.connect()
+        if '/' not in name:
+            row = connection.execute('SELECT data FROM documents WHERE name = ?', (name,)).fetchone()
+            if not row:
+                raise KeyError(f'There is no item named {name!r} in the archive')
+            yield from decode(row[0])
+            return
+        rows = connection.execute('SELECT messages.data FROM members JOIN messages ON messages.member = members.id '
+                                  'WHERE members.name = ? ORDER BY messages.position', (name,))
+        for row in rows:
+            yield decode(row[0])
+
+    def files(self, user_id):
+        """Return set of member files user ID appears in."""
+        rows = self.connect().execute('SELECT members.name FROM message_users '
+                                      'JOIN members ON message_users.member = members.id '
+                                      'WHERE message_users.user_id = ?', (user_id,))
+        return {row[0] for row in rows}
@@ -0,0 +1,82 @@
+import codecs
+import json
+import re
+
+from slackcli.profiling import PROFILE
+
+
+DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class ArrayStream:
+    """Class representing a top level JSON array read incrementally from a binary file object.
+    Iterating yields one decoded item at a time, so only the item being decoded & the unread part
+    of the current chunk are held in memory.
+    """
+    def __init__(self, file, chunk_size=1024 * 1024):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def __iter__(self):
+        self.expect('[')
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.decode_item()
+            if self.expect(',', ']') == ']':
+                return
+
+    def read(self, size=None):
+        """Append next chunk of file to buffer, dropping consumed text. Return False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.file.read(size or self.chunk_size)
+        PROFILE.count('bytes_decompressed', len(chunk))
+        self.buffer = self.buffer[self.position:] + self.decoder.decode(chunk, final=not chunk)
+        self.position = 0
+        self.eof = not chunk
+        return True
+
+    def peek(self):
+        """Return next non-whitespace character, reading more of file as needed."""
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read():
+                raise json.JSONDecodeError('Unexpected end of array', self.buffer, self.position)
+
+    def expect(self, *tokens):
+        """Consume & return next non-whitespace character if it is one of tokens."""
+        token = self.peek()
+        if token not in tokens:
+            raise json.JSONDecodeError(f'Expecting {" or ".join(map(repr, tokens))}', self.buffer, self.position)
+        self.position += 1
+        return token
+
+    def decode_item(self):
+        """Decode next array item. Buffer is grown until the item decodes & is followed by a separator,
+        so a number split across chunks is never decoded early.
+        """
+        self.peek()
+        while True:
+            try:
+                item, end = DECODER.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.read(max(self.chunk_size, len(self.buffer) - self.position)):
+                    raise
+                continue
+            following = WHITESPACE.match(self.buffer, end).end()
+            if following < len(self.buffer) and self.buffer[following] in ',]' or not self.read():
+                self.position = end
+                return item
+
+
+def iter_json_array(file, chunk_size=1024 * 1024):
+    """Generate each item of top level JSON array in binary file object."""
+    return iter(ArrayStream(file, chunk_size))
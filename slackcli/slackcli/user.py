@@ -1,102 +1,165 @@
-from functools import lru_cache
+from slackcli.profiling import PROFILE
+
+
+PROFILE_KEYS = ('real_name', 'email', 'bot_id')
+
+
+def slim_user(user):
+    """Return copy of users file entry with only the fields User reads."""
+    slim = {key: user[key] for key in ('id', 'name', 'is_bot') if key in user}
+    if 'profile' in user:
+        slim['profile'] = {key: user['profile'][key] for key in PROFILE_KEYS if key in user['profile']}
+    return slim
+
+
+class UserDirectory:
+    """Class representing the users file of an export, indexed by id, username, email & bot ID.
+    Built once per export so every user lookup is a constant time dict lookup. Users may be any
+    iterable, such as a stream of the users file, & only the fields User reads are kept.
+    """
+    def __init__(self, users):
+        self.users = []
+        self.ids = {}
+        self.user_names = {}
+        self.emails = {}
+        self.bot_ids = {}
+        self.full_names = {}
+        self.index_users(users)
+
+    def index_users(self, users):
+        """Index position of each user by id, username, lowercased email & bot ID.
+        First occurrence wins to match a top to bottom scan of the users file.
+        """
+        for position, user in enumerate(users):
+            user = slim_user(user)
+            self.users.append(user)
+            profile = user.get('profile', {})
+            self.ids.setdefault(user.get('id'), position)
+            self.user_names.setdefault(user.get('name'), position)
+            if profile.get('email') is not None:
+                self.emails.setdefault(profile['email'].lower(), position)
+            if profile.get('bot_id') is not None:
+                self.bot_ids.setdefault(profile['bot_id'], position)
+
+    def lookup(self, user_id=None, username=None, email=None, bot_id=None):
+        """Return profile data of first user in users file matching any of the given keys."""
+        PROFILE.count('user_lookups')
+        positions = [index[key] for index, key in ((self.ids, user_id),
+                                                   (self.user_names, username),
+                                                   (self.emails, email),
+                                                   (self.bot_ids, bot_id))
+                     if key is not None and key in index]
+        return self.users[min(positions)] if positions else None
+
+    def full_name(self, user_id):
+        """Return full name of user ID. Memoized for the life of the directory."""
+        try:
+            name = self.full_names[user_id]
+        except KeyError:
+            PROFILE.count('user_cache_misses')
+            name = self.full_names[user_id] = User(self, user_id=user_id).full_name
+            return name
+        PROFILE.count('user_cache_hits')
+        return name
 
 
 class User:
-    """Class represnting a Slack user with users profile data."""
-    def __init__(self, users, **kwargs):
-        self.users = users
-        self.kwargs = kwargs
-
-    @property
-    @lru_cache(maxsize=1)
-    def profile_data(self):
-        """Cached Property: Users profile data."""
-        data = None
-        for user in self.users:
-            if user['id'] == self.kwargs.get('user_id') or user['name'] == self.kwargs.get('username'):
-                data = user
-                break
+    """Class represnting a Slack user with users profile data.
+    Fields are resolved from the users directory once on creation.
+    """
+    __slots__ = ('profile_data', 'status', 'email', 'full_name', 'user_id', 'user_name', 'bot_id')
 
-            try:
-                if user['profile']['email'].lower() == self.kwargs.get('email'):
-                    data = user
-                    break
-            except KeyError:
-                pass
+    def __init__(self, directory, **kwargs):
+        data = directory.lookup(**kwargs)
+        slackbot = kwargs.get('user_id') == 'USLACKBOT'
+        self.profile_data = data
 
-            try:
-                if user['profile']['bot_id'] == self.kwargs.get('bot_id'):
-                    data = user
-                    break
-            except KeyError:
-                pass
-
-        return data
-
-    @property
-    @lru_cache(maxsize=1)
-    def status(self):
-        """Cached Property: Users Slack status. Internal, External, App."""
-        if self.profile_data:
-            status = 'Internal User' if not self.profile_data['is_bot'] else 'App'
-        elif self.kwargs.get('user_id') == 'USLACKBOT':
-            status = 'App'
+        if data:
+            self.status = 'Internal User' if not data['is_bot'] else 'App'
+        elif slackbot:
+            self.status = 'App'
         else:
-            status = 'External User'
-        return status
+            self.status = 'External User'
 
-    @property
-    @lru_cache(maxsize=1)
-    def email(self):
-        """Cached Property: Users email."""
         try:
-            email = self.profile_data['profile']['email'].lower()
+            self.email = data['profile']['email'].lower()
         except (TypeError, KeyError):
-            email = self.kwargs.get('email')
-        return email
-
-    @property
-    @lru_cache(maxsize=1)
-    def full_name(self):
-        """Cached Property: Users full name."""
-        if self.kwargs.get('user_id') == 'USLACKBOT':
-            name = 'Slackbot'
-        else:
-            try:
-                name = self.profile_data['profile']['real_name']
-            except (TypeError, KeyError):
-                name = self.kwargs.get('username')
-        return name
+            self.email = kwargs.get('email')
 
-    @property
-    @lru_cache(maxsize=1)
-    def user_id(self):
-        """Cached Property: Users Slack ID."""
         try:
-            id = self.profile_data['id']
+            self.user_id = data['id']
         except (TypeError, KeyError):
-            id = self.kwargs.get('user_id')
-        return id
-
-    @property
-    @lru_cache(maxsize=1)
-    def user_name(self):
-        """Cached Property: Users Slack username."""
-        if self.kwargs.get('user_id') == 'USLACKBOT':
-            name = 'Slackbot'
+            self.user_id = kwargs.get('user_id')
+
+        try:
+            self.bot_id = data['profile']['bot_id']
+        except (TypeError, KeyError):
+            self.bot_id = None
+
+        if slackbot:
+            self.full_name = 'Slackbot'
+            self.user_name = 'Slackbot'
         else:
             try:
-                name = self.profile_data['name']
+                self.full_name = data['profile']['real_name']
             except (TypeError, KeyError):
-                name = self.kwargs.get('username')
-        return name
+                self.full_name = kwargs.get('username')
+            try:
+                self.user_name = data['name']
+            except (TypeError, KeyError):
+                self.user_name = kwargs.get('username')
 
-    @property
-    @lru_cache(maxsize=1)
-    def bot_id(self):
-        """Cached Property: Bot ID"""
-        try:
-            id = self.profile_data['profile']['bot_id']
-        except (TypeError, KeyError):
-            id = None
-        return id
\ No newline at end of file
+
+class Participants:
+    """Class representing the participants of a conversation, in the order they were added.
+    Each participant is indexed by user ID, username, full name & bot ID, so finding the first
+    participant with a given value or adding & removing a participant takes constant time.
+    """
+    KEYS = ('user_id', 'user_name', 'full_name', 'bot_id')
+
+    def __init__(self, users=()):
+        self.users = {}
+        self.seq = 0
+        self.index = {key: {} for key in self.KEYS}
+        for user in users:
+            self.add(user)
+
+    def __iter__(self):
+        return iter(self.users.values())
+
+    def __len__(self):
+        return len(self.users)
+
+    def __getitem__(self, seq):
+        return self.users[seq]
+
+    def add(self, user):
+        """Add user after all current participants. Return its position."""
+        seq = self.seq
+        self.seq += 1
+        self.users[seq] = user
+        for key, index in self.index.items():
+            index.setdefault(getattr(user, key), {})[seq] = None
+        return seq
+
+    def remove(self, seq):
+        """Remove participant at position."""
+        user = self.users.pop(seq)
+        for key, index in self.index.items():
+            value = getattr(user, key)
+            del index[value][seq]
+            if not index[value]:
+                del index[value]
+
+    def has(self, key, value):
+        """Return True if any participant has value for key."""
+        return value in self.index[key]
+
+    def first(self, key, value, where=None, after=-1):
+        """Return position of first participant after position with value for key, that also
+        satisfies where if given. None if there is no such participant.
+        """
+        for seq in self.index[key].get(value, ()):
+            if seq > after and (where is None or where(self.users[seq])):
+                return seq
+        return None
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from slack.errors import SlackApiError
+
+from slackcli import scheduler
+from slackcli.scheduler import Scheduler, TokenBucket
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on."""
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeRandom:
+    """Jitter at its upper bound, so waits are predictable."""
+    @staticmethod
+    def uniform(low, high):
+        return high
+
+
+class ErrorResponse(dict):
+    def __init__(self, status, retry_after=None):
+        super().__init__(ok=False, error='ratelimited' if status == 429 else 'fatal')
+        self.status_code = status
+        self.headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+
+
+class FakeClient:
+    """WebClient whose users_info returns or raises each of outcomes in turn."""
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def users_info(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else {'ok': True, 'user': kwargs}
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def error(status, retry_after=None):
+    return SlackApiError('error', ErrorResponse(status, retry_after))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler, 'time', clock)
+    monkeypatch.setattr(scheduler, 'random', FakeRandom)
+    return clock
+
+
+def test_429_waits_for_retry_after(clock):
+    client = FakeClient(error(429, retry_after=3))
+    sched = Scheduler()
+    assert sched.call(client, 'users_info', user='U1') == {'ok': True, 'user': {'user': 'U1'}}
+    assert client.calls == 2
+    # Retry-After plus up to a second of jitter.
+    assert clock.slept == [0.0, 4.0]
+    stats = sched.stats()['users.info']
+    assert (stats['calls'], stats['throttled'], stats['retries'], stats['waited']) == (2, 1, 1, 4.0)
+
+
+def test_429_pauses_every_call_of_the_method(clock):
+    sched = Scheduler()
+    sched.call(FakeClient(error(429, retry_after=10)), 'users_info', user='U1')
+    start = clock.now
+    sched.call(FakeClient(), 'users_info', user='U2')
+    assert clock.now == start
+    assert sched.stats()['users.info']['calls'] == 3
+
+
+def test_5xx_retried_with_backoff_until_limit(clock):
+    client = FakeClient(*(error(500) for _ in range(Scheduler.MAX_RETRIES + 1)))
+    sched = Scheduler()
+    with pytest.raises(SlackApiError):
+        sched.call(client, 'users_info', user='U1')
+    assert client.calls == Scheduler.MAX_RETRIES + 1
+    backoffs = [min(Scheduler.MAX_BACKOFF, Scheduler.BACKOFF * 2 ** attempt)
+                for attempt in range(Scheduler.MAX_RETRIES)]
+    assert [seconds for seconds in clock.slept if seconds] == backoffs
+    stats = sched.stats()['users.info']
+    assert (stats['calls'], stats['throttled'], stats['retries'], stats['waited']) == \
+           (Scheduler.MAX_RETRIES + 1, 0, Scheduler.MAX_RETRIES, sum(backoffs))
+
+
+def test_5xx_then_success(clock):
+    client = FakeClient(error(503), error(502))
+    sched = Scheduler()
+    assert sched.call(client, 'users_info', user='U1')['ok']
+    stats = sched.stats()['users.info']
+    assert (stats['calls'], stats['retries'], stats['waited']) == (3, 2, 3.0)
+
+
+def test_network_errors_retried(clock):
+    client = FakeClient(asyncio.TimeoutError())
+    sched = Scheduler()
+    assert sched.call(client, 'users_info', user='U1')['ok']
+    assert sched.stats()['users.info']['retries'] == 1
+
+
+def test_4xx_raises_at_once(clock):
+    client = FakeClient(error(404))
+    sched = Scheduler()
+    with pytest.raises(SlackApiError):
+        sched.call(client, 'users_info', user='U1')
+    assert client.calls == 1
+    stats = sched.stats()['users.info']
+    assert (stats['calls'], stats['throttled'], stats['retries'], stats['waited']) == (1, 0, 0, 0.0)
+
+
+def test_stats_kept_per_method(clock):
+    sched = Scheduler()
+    client = FakeClient(error(429, retry_after=1))
+    client.users_list = client.users_info
+    sched.call(client, 'users_info', user='U1')
+    sched.call(client, 'users_list')
+    stats = sched.stats()
+    assert stats['users.info']['calls'] == 2 and stats['users.info']['throttled'] == 1
+    assert stats['users.list']['calls'] == 1 and stats['users.list']['throttled'] == 0
+
+
+def test_bucket_allows_a_minute_of_calls_then_paces_them(clock):
+    bucket = TokenBucket(per_minute=20)
+    assert [bucket.acquire() for _ in range(20)] == [0.0] * 20
+    assert bucket.acquire() == pytest.approx(3.0)
+    assert bucket.acquire() == pytest.approx(3.0)
+
+
+def test_bucket_pause_holds_calls_and_drops_saved_tokens(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.pause(5)
+    # The minute of saved calls is dropped, only the 5 seconds of calls refilled during the pause remain.
+    assert [bucket.acquire() for _ in range(6)] == pytest.approx([5.0, 0.0, 0.0, 0.0, 0.0, 1.0])
@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from slackcli.stream import iter_json_array
+
+
+ARRAYS = [
+    '[]',
+    ' \n[ \t]\n',
+    '[1]',
+    '[12345, -6.5e-3, 0, 1e10]',
+    '[true, false, null]',
+    '["a", "b,c", "d]e", "[f]", ",]", "\\"],"]',
+    '[{"text": "done], moving on, [ok]", "n": [1, [2, [3]]]}, {"text": ""}]',
+    '[{"text": "café ☃ \U0001F600 漢字"}, "ééé"]',
+    '[{"text": "\\u00e9 \\ud83d\\ude00 \\n\\t"}]',
+    '[\n  {"ts": "1577836800.000100", "user": "U1"},\n  {"ts": "1577836801.000200", "user": "U2"}\n]\n',
+    '[[], {}, [[]], {"a": {}}]',
+]
+CHUNK_SIZES = [1, 2, 7]
+
+
+def decode(text, chunk_size, bom=False):
+    """Return list of items decoded from text encoded as UTF-8, read chunk_size bytes at a time."""
+    data = ('\ufeff' + text if bom else text).encode('utf-8')
+    return list(iter_json_array(io.BytesIO(data), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', ARRAYS)
+def test_matches_json_loads(text, chunk_size):
+    assert decode(text, chunk_size) == json.loads(text)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', ARRAYS)
+def test_leading_bom(text, chunk_size):
+    assert decode(text, chunk_size, bom=True) == json.loads(text)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_multibyte_characters_split_across_chunks(chunk_size):
+    # 2, 3 & 4 byte UTF-8 sequences at every offset, so each is split by some chunk boundary.
+    text = json.dumps([{'text': 'x' * offset + 'é☃\U0001F600'} for offset in range(8)],
+                      ensure_ascii=False)
+    assert decode(text, chunk_size) == json.loads(text)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_number_split_across_chunks_is_not_decoded_early(chunk_size):
+    text = '[1234567890123, 98765.4321]'
+    assert decode(text, chunk_size) == [1234567890123, 98765.4321]
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', ['', '[', '[1,', '[{"a": 1}', '{"a": 1}', '[1 2]'])
+def test_invalid_array_raises(text, chunk_size):
+    with pytest.raises(json.JSONDecodeError):
+        decode(text, chunk_size)